@@ -1,5 +1,27 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.core import checks
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        """
+        Connect signal handlers and register system checks of the app.
+
+        Tune new database connections, keep full-text search indexes
+        installed after migrations, drop changed users from the
+        authentication cache and check the API cache backend.
+        """
+        from .authentication import invalidate_user
+        from .caching import check_cache_backend
+        from .database import configure_connection
+        from .search import install_search_indexes
+        connection_created.connect(configure_connection)
+        post_migrate.connect(install_search_indexes, sender=self)
+        post_save.connect(invalidate_user, sender=get_user_model())
+        post_delete.connect(invalidate_user, sender=get_user_model())
+        checks.register(check_cache_backend, checks.Tags.caches)
@@ -0,0 +1,298 @@
+"""Async-native read-only views of the 'api' app."""
+import asyncio
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedJWTAuthentication, aauthenticate
+from .broker import OVERFLOW, get_broker
+from .models import Comment, Group, Post
+from .pagination import (KeysetPagination, after_position, decode_position,
+                         encode_position)
+from .renderers import render_json
+from .rows import (COMMENT_VALUES, GROUP_VALUES, POST_VALUES, comment_row,
+                   group_row, post_row)
+from .throttling import throttled
+
+
+# DRF has no async views, so these are plain Django views running on the
+# event loop under ASGI instead of a thread per request.
+CHUNK_SIZE = 500
+
+
+def json_response(data, status=200):
+    """
+    Return JSON response rendered like DRF 'JSONRenderer' does.
+    """
+    return HttpResponse(render_json(data), status=status,
+                        content_type='application/json')
+
+
+def error_response(detail, status):
+    """
+    Return DRF-style error response.
+    """
+    return json_response({'detail': detail}, status=status)
+
+
+async def get_user(request):
+    """
+    Return user of the request's JWT or None, authenticated once.
+    """
+    if not hasattr(request, '_api_user'):
+        request._api_user = await aauthenticate(request)
+    return request._api_user
+
+
+def authenticated(view):
+    """
+    Decorate an async view to answer invalid credentials with 401.
+
+    The body and 'WWW-Authenticate' header match DRF's response, requests
+    without credentials reach the view anonymous.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            await get_user(request)
+        except AuthenticationFailed as error:
+            detail = error.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {'detail': detail}
+            response = json_response(detail, status=error.status_code)
+            response['WWW-Authenticate'] = (
+                CachedJWTAuthentication().authenticate_header(request)
+            )
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def render_rows(queryset, fields, render, request):
+    """
+    Return rendered rows of the queryset fetched with async iterator.
+    """
+    return [
+        render(row, request)
+        async for row in queryset.values(*fields).aiterator(CHUNK_SIZE)
+    ]
+
+
+@require_safe
+@authenticated
+@throttled('posts', get_user)
+async def post_list(request):
+    """
+    Return posts list, optionally filtered by group and keyset paginated.
+    """
+    queryset = Post.objects.all()
+    group = request.GET.get('group')
+    if group:
+        try:
+            group = int(group)
+        except ValueError:
+            group = None
+        if (group is None or not 0 < group < 2 ** 63
+                or not await Group.objects.filter(pk=group).aexists()):
+            return json_response({'group': [
+                'Select a valid choice. That choice is not one of the '
+                'available choices.'
+            ]}, status=400)
+        queryset = queryset.filter(group=group)
+
+    paginator = KeysetPagination
+    if (paginator.cursor_query_param not in request.GET
+            and paginator.page_size_query_param not in request.GET):
+        return json_response(
+            await render_rows(queryset, POST_VALUES, post_row, request)
+        )
+
+    try:
+        limit = int(request.GET.get(paginator.page_size_query_param,
+                                    paginator.page_size))
+    except ValueError:
+        limit = paginator.page_size
+    limit = min(max(limit, 1), paginator.max_page_size)
+    queryset = queryset.order_by('-pub_date', '-pk')
+    cursor = request.GET.get(paginator.cursor_query_param)
+    if cursor:
+        try:
+            position = decode_position(cursor)
+        except ValueError:
+            return error_response(paginator.invalid_cursor_message, 404)
+        queryset = after_position(queryset, 'pub_date', position)
+
+    page = [
+        row async for row in
+        queryset.values(*POST_VALUES)[:limit + 1].aiterator(CHUNK_SIZE)
+    ]
+    next_link = None
+    if len(page) > limit:
+        page = page[:limit]
+        query = request.GET.copy()
+        query[paginator.page_size_query_param] = limit
+        query[paginator.cursor_query_param] = encode_position(
+            page[-1]['pub_date'], page[-1]['id']
+        )
+        next_link = request.build_absolute_uri(
+            f'{request.path}?{query.urlencode()}'
+        )
+    query = request.GET.copy()
+    query.pop(paginator.cursor_query_param, None)
+    first_link = request.build_absolute_uri(request.path)
+    if query:
+        first_link = f'{first_link}?{query.urlencode()}'
+    return json_response({
+        'next': next_link,
+        'first': first_link,
+        'results': [post_row(row, request) for row in page],
+    })
+
+
+@require_safe
+@authenticated
+@throttled('posts', get_user)
+async def post_detail(request, pk):
+    """
+    Return a single post.
+    """
+    row = await Post.objects.filter(pk=pk).values(*POST_VALUES).afirst()
+    if row is None:
+        return error_response('No Post matches the given query.', 404)
+    return json_response(post_row(row, request))
+
+
+async def get_post_comments(request, post_id):
+    """
+    Return '(comments queryset, None)' or '(None, error response)'.
+    """
+    if await get_user(request) is None:
+        return None, error_response(
+            'Authentication credentials were not provided.', 401
+        )
+    if not await Post.objects.filter(pk=post_id).aexists():
+        return None, error_response('No Post matches the given query.', 404)
+    return Comment.objects.filter(post=post_id), None
+
+
+@require_safe
+@authenticated
+@throttled('comments', get_user)
+async def comment_list(request, post_id):
+    """
+    Return comments of the post.
+    """
+    queryset, error = await get_post_comments(request, post_id)
+    if error is not None:
+        return error
+    return json_response(
+        await render_rows(queryset, COMMENT_VALUES, comment_row, request)
+    )
+
+
+@require_safe
+@authenticated
+@throttled('comments', get_user)
+async def comment_detail(request, post_id, pk):
+    """
+    Return a single comment of the post.
+    """
+    queryset, error = await get_post_comments(request, post_id)
+    if error is not None:
+        return error
+    row = await queryset.filter(pk=pk).values(*COMMENT_VALUES).afirst()
+    if row is None:
+        return error_response('No Comment matches the given query.', 404)
+    return json_response(comment_row(row, request))
+
+
+@require_safe
+@authenticated
+@throttled('group', get_user)
+async def group_list(request):
+    """
+    Return all groups.
+    """
+    return json_response(
+        await render_rows(Group.objects.all(), GROUP_VALUES, group_row,
+                          request)
+    )
+
+
+def format_event(comment):
+    """
+    Return server-sent event of the comment.
+    """
+    data = render_json(comment).decode()
+    return f'id: {comment["id"]}\nevent: comment\ndata: {data}\n\n'
+
+
+async def comment_events(request, post_id, last_id, subscription):
+    """
+    Yield comment events of the post newer than 'last_id'.
+
+    Writers publish after their own commits, so events may arrive out of
+    id order: delivered ids are tracked instead of a high-water mark.
+    Missed comments are replayed from the database first and again after
+    the subscription overflows, skipping delivered ones.
+    """
+    heartbeat = getattr(settings, 'COMMENT_EVENTS_HEARTBEAT', 15)
+    delivered = set()
+    try:
+        replay = True
+        while True:
+            if replay:
+                replay = False
+                comments = Comment.objects.filter(
+                    post=post_id, pk__gt=last_id
+                ).order_by('pk').values(*COMMENT_VALUES)
+                async for row in comments.aiterator(CHUNK_SIZE):
+                    if row['id'] not in delivered:
+                        delivered.add(row['id'])
+                        yield format_event(comment_row(row, request))
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if event is OVERFLOW:
+                replay = True
+            elif event['id'] > last_id and event['id'] not in delivered:
+                delivered.add(event['id'])
+                yield format_event(event)
+    finally:
+        subscription.close()
+
+
+@require_safe
+@authenticated
+@throttled('comments', get_user)
+async def comment_stream(request, post_id):
+    """
+    Stream new comments of the post as server-sent events.
+
+    'Last-Event-ID' header resumes the stream after the given comment id.
+    Needs an ASGI server, the response never ends on its own.
+    """
+    queryset, error = await get_post_comments(request, post_id)
+    if error is not None:
+        return error
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        return error_response('Invalid Last-Event-ID', 400)
+    if not last_id:
+        last_id = await queryset.order_by('-pk').values_list(
+            'pk', flat=True
+        ).afirst() or 0
+    subscription = get_broker().subscribe(f'comments:{post_id}')
+    response = StreamingHttpResponse(
+        comment_events(request, post_id, last_id, subscription),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,89 @@
+"""DRF authentication classes of the 'api' app."""
+from copy import copy
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .lru import LRUCache
+
+
+user_cache = LRUCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+)
+
+
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Drop saved or deleted user from the authentication cache.
+    """
+    user_cache.pop(str(instance.pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    'JWTAuthentication' keeping recently authenticated users in memory.
+
+    Users are cached by id for 'AUTH_USER_CACHE_TTL' seconds and dropped on
+    save or delete, so deactivation takes effect at once in the process that
+    made it and within TTL in other processes.
+    """
+
+    def get_user(self, validated_token):
+        """
+        Return cached user or load it from the database.
+        """
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            return super().get_user(validated_token)
+        user_id = str(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return copy(user)
+
+
+async def aauthenticate(request):
+    """
+    Return user of the JWT in a plain Django request or None.
+
+    Counterpart of 'CachedJWTAuthentication' for async views: the token is
+    verified in place and the user is loaded with the async ORM on cache
+    miss. None means no credentials, invalid ones raise
+    'AuthenticationFailed' like DRF authentication does.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    validated_token = authentication.get_validated_token(raw_token)
+    if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+        return await sync_to_async(authentication.get_user)(validated_token)
+    user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        raise InvalidToken(
+            _('Token contained no recognizable user identification')
+        )
+    user_id = str(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).afirst()
+        if user is None:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+        user_cache.set(user_id, user)
+    return copy(user)
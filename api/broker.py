@@ -0,0 +1,113 @@
+"""Pub/sub brokers of the 'api' app."""
+import asyncio
+from functools import lru_cache
+from threading import Lock
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+OVERFLOW = object()
+
+
+class Subscription:
+    """
+    Bounded queue of events of one channel consumed on an event loop.
+
+    A consumer falling behind by more than 'maxsize' events gets a single
+    'OVERFLOW' marker instead of the dropped events and is expected to
+    catch up from the database.
+    """
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def offer(self, event):
+        """
+        Put event into the queue, replacing its content by 'OVERFLOW' if full.
+
+        Must be called on the subscription's event loop.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self):
+        """
+        Return next event or 'OVERFLOW'.
+        """
+        return await self.queue.get()
+
+    def close(self):
+        """
+        Stop receiving events.
+        """
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Broker delivering events to subscribers of the same process.
+
+    'publish' is safe to call from any thread, events are handed to each
+    subscriber's event loop.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._channels = {}
+        self._lock = Lock()
+
+    def subscribe(self, channel):
+        """
+        Return new subscription to the channel.
+
+        Must be called from a running event loop.
+        """
+        subscription = Subscription(self, channel, self.maxsize)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove the subscription from its channel.
+        """
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._channels.pop(subscription.channel, None)
+
+    def publish(self, channel, event):
+        """
+        Deliver event to all current subscribers of the channel.
+        """
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.offer, event
+                )
+            except RuntimeError:
+                self.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """
+    Return broker configured with 'COMMENT_EVENTS_BROKER' setting.
+    """
+    broker_class = import_string(getattr(
+        settings, 'COMMENT_EVENTS_BROKER', 'api.broker.InProcessBroker'
+    ))
+    return broker_class(
+        maxsize=getattr(settings, 'COMMENT_EVENTS_QUEUE_SIZE', 100)
+    )
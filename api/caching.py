@@ -0,0 +1,228 @@
+"""Serialized response caching and conditional GET of the 'api' app."""
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+def get_cache():
+    """
+    Return cache backend configured for API responses.
+    """
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def check_cache_backend(app_configs, **kwargs):
+    """
+    Warn if API responses are cached in a per-process backend.
+
+    Versions kept in such a cache are bumped by the writing process only,
+    so other worker processes would serve stale data and validators.
+    """
+    if not isinstance(get_cache(), LocMemCache):
+        return []
+    return [Warning(
+        'API_CACHE_ALIAS points to a local-memory cache.',
+        hint='It is only safe with a single server process, use a cache '
+             'shared between processes, such as the file-based one, '
+             'otherwise.',
+        id='api.W001',
+    )]
+
+
+def get_version(resource):
+    """
+    Return current cache version of the resource.
+
+    Missing version is initialized from the clock, so entries of an evicted
+    version can never become current again.
+    """
+    cache = get_cache()
+    key = f'api:version:{resource}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(resource):
+    """
+    Invalidate all cached responses of the resource.
+    """
+    cache = get_cache()
+    key = f'api:version:{resource}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(f'api:modified:{resource}', time.time(), timeout=None)
+
+
+def get_modified(resource):
+    """
+    Return timestamp of the last write to the resource.
+
+    Unknown write time is assumed to be now, so clients never get a false
+    'Not Modified' answer.
+    """
+    cache = get_cache()
+    key = f'api:modified:{resource}'
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, time.time(), timeout=None)
+        modified = cache.get(key)
+    if modified is None:
+        return time.time()
+    return modified
+
+
+class CachedResponseMixin:
+    """
+    Cache serialized data of 'list' action.
+
+    Entries are keyed by resource version, full request path and data
+    aggregates. Any successful unsafe request bumps versions of
+    'get_cache_resources'.
+
+    Responses carry 'ETag' and 'Last-Modified' validators computed with one
+    aggregate query over 'conditional_field', so conditional requests are
+    answered with 304 without serializing the body.
+
+    With several worker processes 'API_CACHE_ALIAS' must point to a cache
+    shared between them, see 'check_cache_backend'.
+
+    Only safe actions whose data does not depend on the current user should
+    be cached: permissions are checked before the cache is consulted, but
+    the cached data is shared between users.
+    """
+
+    cache_resource = None
+    conditional_field = None
+
+    def get_cache_resources(self):
+        """
+        Return resource names whose versions are bumped on write.
+        """
+        return [self.cache_resource]
+
+    def get_cache_key(self, request, etag):
+        """
+        Return cache key of the response data with the given validator.
+
+        Validator changes with any insert or delete even if it bypasses the
+        viewset, so such writes do not serve stale data either.
+        """
+        resource = self.get_cache_resources()[0]
+        return f'api:response:{resource}:{etag}'
+
+    def get_validators(self, request):
+        """
+        Return '(etag, last_modified)' of the requested data.
+
+        Return None if the requested object does not exist.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            try:
+                queryset = queryset.filter(
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                )
+            except (TypeError, ValueError, ValidationError):
+                # Malformed lookup, the handler responds with 404.
+                return None
+        aggregates = {'count': Count('pk')}
+        if self.conditional_field:
+            aggregates['last'] = Max(self.conditional_field)
+        result = queryset.aggregate(**aggregates)
+        if lookup_url_kwarg in self.kwargs and not result['count']:
+            return None
+
+        resource = self.get_cache_resources()[0]
+        last_modified = get_modified(resource)
+        if result.get('last') is not None:
+            last_modified = max(last_modified, result['last'].timestamp())
+        raw = (f'{get_version(resource)}:{result["count"]}:'
+               f'{result.get("last")}:{request.build_absolute_uri()}:'
+               f'{request.accepted_renderer.format}')
+        return f'"{md5(raw.encode()).hexdigest()}"', int(last_modified)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        """
+        Return 304, response built from cache or produced by handler.
+        """
+        validators = self.get_validators(request)
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            cache = get_cache()
+            key = self.get_cache_key(request, etag)
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    cache.set(key, response.data,
+                              getattr(settings, 'API_CACHE_TIMEOUT', 300))
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def invalidate_cache(self):
+        """
+        Bump versions of all resources affected by a write.
+        """
+        for resource in self.get_cache_resources():
+            bump_version(resource)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Override finalize_response function.
+
+        Invalidate cached responses after a successful write.
+        """
+        if (request.method not in SAFE_METHODS
+                and status.is_success(response.status_code)):
+            self.invalidate_cache()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Override list function.
+
+        Serve list data from cache.
+        """
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """
+    Also cache serialized data of 'retrieve' action.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Override retrieve function.
+
+        Serve object data from cache.
+        """
+        return self.cached_response(request, super().retrieve,
+                                    *args, **kwargs)
@@ -0,0 +1,119 @@
+"""Denormalized counters of the 'api' app."""
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Follow, FollowCounts, Post, User
+
+
+def change_comments_count(post_id, delta):
+    """
+    Atomically shift the post's comment counter by delta.
+
+    Counter never goes below zero, drift is fixed by reconciliation.
+    """
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comments_count__gte=-delta)
+    posts.update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def reconcile_comments_count(batch_size=1000):
+    """
+    Recompute drifted 'Post.comments_count' values in primary key batches.
+
+    Return number of fixed posts.
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1]
+        drifted = Post.objects.filter(
+            pk__gte=batch[0], pk__lte=last_pk
+        ).order_by().annotate(
+            actual=Count('comments')
+        ).exclude(
+            comments_count=F('actual')
+        ).values_list('pk', 'actual')
+        with transaction.atomic():
+            for pk, actual in drifted:
+                Post.objects.filter(pk=pk).update(comments_count=actual)
+                fixed += 1
+
+
+def change_follow_counts(user_id, following_id, delta):
+    """
+    Atomically shift counters of a follow link by delta.
+
+    'user_id' gets its following counter changed, 'following_id' its
+    followers counter. Missing counter rows are created first.
+    """
+    FollowCounts.objects.bulk_create(
+        [FollowCounts(user_id=user_id), FollowCounts(user_id=following_id)],
+        ignore_conflicts=True,
+    )
+    for pk, field in ((user_id, 'following_count'),
+                      (following_id, 'followers_count')):
+        counts = FollowCounts.objects.filter(pk=pk)
+        if delta < 0:
+            counts = counts.filter(**{f'{field}__gte': -delta})
+        counts.update(**{field: F(field) + delta})
+
+
+def get_follow_counts(user_ids):
+    """
+    Return actual '{user_id: (followers, following)}' of users with follows.
+    """
+    counts = {}
+    for field, index in (('following_id', 0), ('user_id', 1)):
+        rows = Follow.objects.filter(**{f'{field}__in': user_ids}).order_by()\
+            .values_list(field).annotate(total=Count('pk'))
+        for pk, total in rows:
+            counts.setdefault(pk, [0, 0])[index] = total
+    return {pk: tuple(value) for pk, value in counts.items()}
+
+
+def reconcile_follow_counts(batch_size=1000):
+    """
+    Recompute drifted 'FollowCounts' rows in user primary key batches.
+
+    Return number of fixed users.
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            User.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1]
+        actual = get_follow_counts(batch)
+        stored = {
+            pk: (followers, following)
+            for pk, followers, following in FollowCounts.objects.filter(
+                pk__in=batch
+            ).values_list('pk', 'followers_count', 'following_count')
+        }
+        drifted = []
+        for pk in batch:
+            counts = actual.get(pk, (0, 0))
+            if stored.get(pk, (0, 0)) != counts:
+                drifted.append(FollowCounts(user_id=pk,
+                                            followers_count=counts[0],
+                                            following_count=counts[1]))
+        FollowCounts.objects.bulk_create(
+            drifted, update_conflicts=True, unique_fields=['user'],
+            update_fields=['followers_count', 'following_count'],
+        )
+        fixed += len(drifted)
@@ -0,0 +1,154 @@
+"""Database connection tuning and routing of the 'api' app."""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import CachedJWTAuthentication
+from .caching import get_cache
+
+
+# Set by 'ReplicaRoutingMiddleware' for requests allowed to read replicas.
+use_replica = ContextVar('use_replica', default=False)
+
+
+def get_sqlite_pragmas():
+    """
+    Return PRAGMA values of the profile selected by 'SQLITE_PROFILE'.
+    """
+    profiles = getattr(settings, 'SQLITE_PROFILES', {})
+    return profiles.get(getattr(settings, 'SQLITE_PROFILE', None), {})
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Apply tuning PRAGMAs to every new SQLite connection.
+
+    'journal_mode' is persistent in the database file, the rest of the
+    PRAGMAs only live as long as the connection, so they are applied by
+    this 'connection_created' handler rather than once after migrate.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def get_replicas():
+    """
+    Return aliases of read replicas of the default database.
+    """
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def get_client_id(request):
+    """
+    Return id telling the request's client apart or None for anonymous one.
+
+    Authenticated clients are told apart by user id, taken from the claim
+    of a valid JWT before DRF authenticates the request, other clients by
+    their session.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = None
+    if header is not None:
+        raw_token = authentication.get_raw_token(header)
+    if raw_token is not None:
+        try:
+            validated_token = authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            return None
+        return f'user:{validated_token.get(api_settings.USER_ID_CLAIM)}'
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        return f'session:{session.session_key}'
+    return None
+
+
+def get_sticky_key(request):
+    """
+    Return cache key pinning the request's client to the primary.
+
+    Return None for anonymous requests.
+    """
+    client_id = get_client_id(request)
+    if client_id is None:
+        return None
+    return f'api:sticky:{client_id}'
+
+
+def is_sticky(request):
+    """
+    Return True if the client wrote recently and must read the primary.
+    """
+    key = get_sticky_key(request)
+    return key is not None and get_cache().get(key) is not None
+
+
+def stick_to_primary(request):
+    """
+    Read the primary for 'REPLICA_STICKY_SECONDS' after client's write.
+
+    The mark is kept in the shared API cache, so it holds whichever worker
+    serves the client's next request.
+    """
+    key = get_sticky_key(request)
+    if key is not None:
+        get_cache().set(key, True,
+                        getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+def reads_replica(view_func):
+    """
+    Return True if the view belongs to the API and may read replicas.
+
+    Admin and other site views always read the primary.
+    """
+    if view_func is None:
+        return False
+    view = (getattr(view_func, 'cls', None)
+            or getattr(view_func, 'view_class', None) or view_func)
+    return view.__module__.split('.')[0] == __name__.split('.')[0]
+
+
+class ReplicaRouter:
+    """
+    Send reads of safe API requests to a random replica, the rest to
+    primary.
+
+    Only requests marked by 'ReplicaRoutingMiddleware' read replicas, so
+    writes, reads inside write requests, management commands and
+    background workers always see the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        """
+        Return replica alias if the current request may read one.
+        """
+        replicas = get_replicas()
+        if replicas and use_replica.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        """
+        Return primary alias, even for instances read from a replica.
+        """
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allow relations between objects of the primary and its replicas.
+        """
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,68 @@
+"""Streaming NDJSON export of the 'api' app."""
+from itertools import groupby, islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Post
+
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'author__username', 'group')
+COMMENT_FIELDS = ('id', 'post', 'text', 'created', 'author__username')
+
+
+def parse_since(value):
+    """
+    Return aware datetime of the export watermark or None if it is empty.
+
+    Raise ValueError for malformed value.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        raise ValueError(f'Invalid datetime: {value}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def rename_author(row):
+    """
+    Replace joined 'author__username' key with 'author'.
+    """
+    row['author'] = row.pop('author__username')
+    return row
+
+
+def iter_export(since=None, chunk_size=1000):
+    """
+    Yield NDJSON lines of posts with embedded comments.
+
+    Posts are read in '(pub_date, id)' order with a server-side iterator,
+    comments are fetched with one query per chunk of posts, so memory use
+    does not depend on table size. Only posts published after 'since' are
+    exported if it is given.
+    """
+    posts = Post.objects.order_by('pub_date', 'pk')
+    if since is not None:
+        posts = posts.filter(pub_date__gt=since)
+    rows = posts.values(*POST_FIELDS).iterator(chunk_size=chunk_size)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        comments = Comment.objects.filter(
+            post__in=[row['id'] for row in chunk]
+        ).order_by('post', 'created', 'pk').values(*COMMENT_FIELDS)
+        by_post = {
+            post_id: [rename_author(comment) for comment in group]
+            for post_id, group in groupby(comments.iterator(chunk_size),
+                                          key=lambda row: row['post'])
+        }
+        for row in chunk:
+            row = rename_author(row)
+            row['comments'] = by_post.get(row['id'], [])
+            yield encoder.encode(row) + '\n'
@@ -0,0 +1,155 @@
+"""Home timeline materialization of the 'api' app."""
+from heapq import merge
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+
+from .group_posts import sort_key
+from .models import Follow, FollowCounts, Post, TimelineEntry
+from .pagination import after_condition
+from .rows import POST_VALUES
+
+
+def get_fanout_limit():
+    """
+    Return follower count above which posts are fanned out on read.
+    """
+    return getattr(settings, 'FEED_FANOUT_FOLLOWER_LIMIT', 10000)
+
+
+def get_batch_size():
+    """
+    Return batch size used for bulk timeline writes.
+    """
+    return getattr(settings, 'FEED_BATCH_SIZE', 1000)
+
+
+def bulk_insert(entries):
+    """
+    Insert timeline entries from an iterable in fixed-size batches.
+
+    Return number of processed entries.
+    """
+    batch_size = get_batch_size()
+    entries = iter(entries)
+    total = 0
+    while True:
+        batch = list(islice(entries, batch_size))
+        if not batch:
+            return total
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        total += len(batch)
+
+
+def is_fanout_on_read(author):
+    """
+    Return True if the author has too many followers for fan-out on write.
+
+    Followers are taken from the stored 'FollowCounts' counter.
+    """
+    return FollowCounts.objects.filter(
+        user=author, followers_count__gt=get_fanout_limit()
+    ).exists()
+
+
+def fan_out_on_read_authors(user):
+    """
+    Return ids of followed authors whose posts are not materialized.
+
+    Authors are picked by their stored 'FollowCounts' counters, so the cost
+    depends on the number of followed authors only.
+    """
+    return Follow.objects.filter(
+        user=user,
+        following__follow_counts__followers_count__gt=get_fanout_limit(),
+    ).values('following')
+
+
+def fan_out_posts(author, posts):
+    """
+    Write author's posts into timelines of all author's followers in bulk.
+
+    Nothing is written for authors with followers above the fan-out limit,
+    their posts are merged into the feed on read instead.
+    """
+    if is_fanout_on_read(author):
+        return
+    followers = Follow.objects.filter(
+        following=author
+    ).values_list('user_id', flat=True)
+    bulk_insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator(chunk_size=get_batch_size())
+        for post in posts
+    )
+
+
+def backfill_timeline(user, author):
+    """
+    Materialize recent posts of a newly followed author in user's timeline.
+    """
+    if is_fanout_on_read(author):
+        return
+    size = getattr(settings, 'FEED_BACKFILL_SIZE', 100)
+    posts = Post.objects.filter(author=author).values_list('pk', 'pub_date')
+    bulk_insert(
+        TimelineEntry(user=user, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts[:size]
+    )
+
+
+def rebuild_timeline(user):
+    """
+    Drop and re-materialize user's timeline from followed authors' posts.
+
+    Return number of written entries.
+    """
+    TimelineEntry.objects.filter(user=user).delete()
+    posts = Post.objects.filter(
+        author__following__user=user
+    ).exclude(
+        author__in=fan_out_on_read_authors(user)
+    ).values_list('pk', 'pub_date')
+    return bulk_insert(
+        TimelineEntry(user=user, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts.iterator(chunk_size=get_batch_size())
+    )
+
+
+def get_feed_rows(user, position=None, limit=None):
+    """
+    Return '.values()' rows of user's home timeline, newest first.
+
+    Materialized entries are read through the '(user, -pub_date, -post)'
+    index of the timeline, posts of followed authors fanned out on read
+    through the '(author, -pub_date, -id)' index of posts, one query each.
+    Up to 'limit' rows placed after the '(pub_date, id)' position are
+    returned.
+    """
+    materialized = Q(timeline_entries__user=user)
+    authored = Q()
+    if position is not None:
+        materialized &= after_condition('timeline_entries__pub_date',
+                                        position, 'timeline_entries__post_id')
+        authored = after_condition('pub_date', position)
+    # One filter() call, so the conditions share the timeline join.
+    materialized = Post.objects.filter(materialized).order_by(
+        '-timeline_entries__pub_date', '-timeline_entries__post_id'
+    ).values(*POST_VALUES)
+    sources = [materialized[:limit]]
+    for author_id in fan_out_on_read_authors(user).values_list(
+            'following', flat=True):
+        sources.append(Post.objects.filter(
+            authored, author_id=author_id
+        ).order_by('-pub_date', '-pk').values(*POST_VALUES)[:limit])
+    rows = []
+    seen = set()
+    # Posts materialized before their author got popular come twice.
+    for row in merge(*sources, key=sort_key, reverse=True):
+        if row['id'] not in seen:
+            seen.add(row['id'])
+            rows.append(row)
+            if len(rows) == limit:
+                break
+    return rows
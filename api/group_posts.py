@@ -0,0 +1,149 @@
+"""In-process cache of the newest posts of groups of the 'api' app."""
+from itertools import groupby
+from threading import Lock
+
+from django.conf import settings
+
+from .lru import LRUCache
+from .models import Group, Post
+from .rows import POST_VALUES
+
+
+# Group id to '(rows, complete)', where rows are '.values()' rows of the
+# newest posts, newest first, and complete tells the group has no more.
+recent_posts = LRUCache(
+    maxsize=getattr(settings, 'GROUP_POSTS_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'GROUP_POSTS_CACHE_TTL', 60),
+)
+
+_update_lock = Lock()
+
+# Group id to number of writes merged into or dropping its cached list,
+# loads that overlap a write are not stored.
+_writes = {}
+
+
+def get_depth():
+    """
+    Return number of newest posts cached per group.
+    """
+    return getattr(settings, 'GROUP_POSTS_CACHE_DEPTH', 50)
+
+
+def sort_key(row):
+    """
+    Return key ordering rows by '(pub_date, id)'.
+    """
+    return row['pub_date'], row['id']
+
+
+def _touch(group_id):
+    """
+    Count a write to the group, must be called under the lock.
+    """
+    _writes[group_id] = _writes.get(group_id, 0) + 1
+
+
+def get_recent_posts(group_id):
+    """
+    Return '(rows, complete)' of the newest posts of the group or None if
+    there is no such group.
+
+    Cache misses are loaded with one query over the group index, groups
+    without posts are checked to exist before being cached. Loaded rows
+    are stored under the lock unless another load stored the group or a
+    write touched it meanwhile.
+    """
+    entry = recent_posts.get(group_id)
+    if entry is None:
+        writes = _writes.get(group_id, 0)
+        depth = get_depth()
+        rows = list(Post.objects.filter(group_id=group_id).order_by(
+            '-pub_date', '-pk'
+        ).values(*POST_VALUES)[:depth + 1])
+        if not rows and not Group.objects.filter(pk=group_id).exists():
+            return None
+        entry = (rows[:depth], len(rows) <= depth)
+        with _update_lock:
+            current = recent_posts.get(group_id)
+            if current is not None:
+                return current
+            if _writes.get(group_id, 0) == writes:
+                recent_posts.set(group_id, entry)
+    return entry
+
+
+def post_values(post):
+    """
+    Return '.values()' row of a saved post with its author loaded.
+    """
+    return {
+        'id': post.pk,
+        'author__username': post.author.username,
+        'image': post.image.name or None,
+        'image_variants': post.image_variants,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'comments_count': post.comments_count,
+    }
+
+
+def add_posts(posts):
+    """
+    Merge new posts into cached lists of their groups.
+
+    Groups missing from the cache are left to the next read.
+    """
+    posts = sorted((post for post in posts if post.group_id is not None),
+                   key=lambda post: post.group_id)
+    depth = get_depth()
+    for group_id, group in groupby(posts, key=lambda post: post.group_id):
+        with _update_lock:
+            _touch(group_id)
+            entry = recent_posts.get(group_id)
+            if entry is None:
+                continue
+            rows, complete = entry
+            rows = sorted(rows + [post_values(post) for post in group],
+                          key=sort_key, reverse=True)
+            recent_posts.set(group_id,
+                             (rows[:depth], complete and len(rows) <= depth))
+
+
+def refresh_comments_count(group_id, post_id):
+    """
+    Set current 'comments_count' of the post in cached list of its group.
+
+    Groups missing from the cache and posts older than the cached list
+    are left as they are. The counter is read under the lock, so the
+    latest update wins.
+    """
+    if group_id is None:
+        return
+    with _update_lock:
+        _touch(group_id)
+        entry = recent_posts.get(group_id)
+        if entry is None:
+            return
+        rows, complete = entry
+        if not any(row['id'] == post_id for row in rows):
+            return
+        count = Post.objects.filter(pk=post_id).values_list(
+            'comments_count', flat=True
+        ).first()
+        if count is None:
+            return
+        rows = [{**row, 'comments_count': count} if row['id'] == post_id
+                else row for row in rows]
+        recent_posts.set(group_id, (rows, complete))
+
+
+def discard_groups(*group_ids):
+    """
+    Drop cached lists of groups whose posts were changed or deleted.
+    """
+    with _update_lock:
+        for group_id in group_ids:
+            if group_id is not None:
+                _touch(group_id)
+                recent_posts.pop(group_id)
@@ -0,0 +1,47 @@
+"""Batch fetching of posts by id of the 'api' app."""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Comment
+from .rows import COMMENT_VALUES, comment_row
+
+
+def parse_ids(values, max_items):
+    """
+    Return unique ids of repeated or comma separated values in given order.
+
+    Raise ValueError for malformed ids, ids out of the positive 64-bit
+    range or more than 'max_items' ids.
+    """
+    try:
+        ids = list(dict.fromkeys(
+            int(item) for value in values for item in value.split(',') if item
+        ))
+    except ValueError:
+        raise ValueError('Ids must be integers.')
+    if any(not 0 < pk < 2 ** 63 for pk in ids):
+        raise ValueError('Ids must be integers.')
+    if len(ids) > max_items:
+        raise ValueError(f'Ensure this list has no more than {max_items} '
+                         f'items.')
+    return ids
+
+
+def get_latest_comments(post_ids, limit, request=None):
+    """
+    Return '{post_id: [comment, ...]}' with up to 'limit' newest comments.
+
+    All posts are served by one query ranking comments of every post with
+    a window function over the '(post, -created, -id)' index.
+    """
+    comments = Comment.objects.filter(post_id__in=post_ids).annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=F('post_id'),
+            order_by=(F('created').desc(), F('id').desc()),
+        )
+    ).filter(rank__lte=limit).order_by('post_id', '-created', '-id')
+    by_post = {post_id: [] for post_id in post_ids}
+    for row in comments.values(*COMMENT_VALUES):
+        by_post[row['post']].append(comment_row(row, request))
+    return by_post
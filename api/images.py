@@ -0,0 +1,123 @@
+"""Post image variants pipeline of the 'api' app."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from .caching import bump_version
+from .group_posts import discard_groups
+from .models import Post
+
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'IMAGE_VARIANTS_WORKERS', 2),
+    thread_name_prefix='image-variants',
+)
+
+
+def get_sizes():
+    """
+    Return mapping of variant names to their maximal side in pixels.
+    """
+    return getattr(settings, 'IMAGE_VARIANTS',
+                   {'small': 320, 'medium': 800, 'large': 1600})
+
+
+def render_variants(source, name):
+    """
+    Save resized WebP and JPEG copies of the source image.
+
+    Return mapping of '<size>_<format>' keys to storage paths.
+    """
+    base, _ = os.path.splitext(os.path.basename(name))
+    variants = {}
+    with Image.open(source) as image:
+        image.load()
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        for size_name, size in get_sizes().items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            for extension, (image_format, options) in FORMATS.items():
+                buffer = BytesIO()
+                resized.save(buffer, image_format, **options)
+                path = default_storage.save(
+                    f'posts/variants/{base}_{size_name}.{extension}',
+                    ContentFile(buffer.getvalue()),
+                )
+                variants[f'{size_name}_{extension}'] = path
+    return variants
+
+
+def build_variants(post_id):
+    """
+    Render variants of the post's current image and store their paths.
+    """
+    try:
+        post = Post.objects.only('image', 'group').get(pk=post_id)
+        if not post.image:
+            return
+        with post.image.open('rb') as source:
+            variants = render_variants(source, post.image.name)
+        updated = Post.objects.filter(
+            pk=post_id, image=post.image.name
+        ).update(image_variants=variants)
+        if not updated:
+            # The image was replaced or the post deleted meanwhile.
+            delete_files(None, variants)
+            return
+        bump_version('posts')
+        discard_groups(post.group_id)
+    except Post.DoesNotExist:
+        return
+    finally:
+        if getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+            close_old_connections()
+
+
+def schedule_variants(post):
+    """
+    Queue variants rendering once the post's transaction is committed.
+
+    Heavy resizing runs in the worker pool instead of the request thread
+    unless 'IMAGE_VARIANTS_ASYNC' is off.
+    """
+    if not post.image:
+        return
+
+    def submit():
+        if getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+            executor.submit(build_variants, post.pk)
+        else:
+            build_variants(post.pk)
+
+    transaction.on_commit(submit)
+
+
+def delete_files(name, variants):
+    """
+    Remove the image and its variants from the storage.
+    """
+    for path in (name, *variants.values()):
+        if path:
+            default_storage.delete(path)
+
+
+def schedule_cleanup(name, variants):
+    """
+    Remove the image and its variants once the transaction is committed.
+
+    Rolled back transactions keep the files still referenced by the post.
+    """
+    if name or variants:
+        transaction.on_commit(lambda: delete_files(name, variants))
@@ -0,0 +1,67 @@
+"""In-process bounded caches of the 'api' app."""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """
+    Thread-safe mapping bounded by size with optional entry time-to-live.
+
+    Least recently used entries are evicted first when the cache is full,
+    expired entries are dropped on access.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Return cached value and mark it as recently used.
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store value evicting the least recently used entry if full.
+        """
+        expires = None
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Remove entry and return its value.
+        """
+        with self._lock:
+            item = self._data.pop(key, None)
+        if item is None:
+            return default
+        return item[1]
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self._data.clear()
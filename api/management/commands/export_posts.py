@@ -0,0 +1,45 @@
+"""Management command exporting posts with comments as NDJSON."""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import iter_export, parse_since
+
+
+class Command(BaseCommand):
+    """
+    Write 'models.Post' entries with embedded comments as NDJSON.
+    """
+
+    help = 'Export posts with comments as NDJSON.'
+
+    def add_arguments(self, parser):
+        """
+        Add watermark, output and chunk size options.
+        """
+        parser.add_argument(
+            '--since',
+            help='Export only posts published after this datetime.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Output file path, stdout by default.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of posts fetched per query.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Stream export lines to the output.
+        """
+        try:
+            since = parse_since(options['since'])
+        except ValueError as error:
+            raise CommandError(error)
+        lines = iter_export(since, options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            output.writelines(lines)
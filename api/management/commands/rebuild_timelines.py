@@ -0,0 +1,41 @@
+"""Management command rebuilding materialized home timelines."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from api.feed import rebuild_timeline
+from api.models import User
+
+
+class Command(BaseCommand):
+    """
+    Re-materialize home timelines from 'models.Follow' and 'models.Post'.
+    """
+
+    help = 'Rebuild materialized home timelines of users.'
+
+    def add_arguments(self, parser):
+        """
+        Add optional list of usernames to rebuild.
+        """
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Usernames to rebuild, all timeline owners by default.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Rebuild timelines user by user, each one in its own transaction.
+        """
+        users = User.objects.filter(
+            Q(follower__isnull=False) | Q(timeline__isnull=False)
+        ).distinct()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+        total = 0
+        for user in users.iterator():
+            with transaction.atomic():
+                total += rebuild_timeline(user)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt timelines, {total} entries written.'
+        ))
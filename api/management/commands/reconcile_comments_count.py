@@ -0,0 +1,30 @@
+"""Management command recomputing denormalized comment counters."""
+from django.core.management.base import BaseCommand
+
+from api.counters import reconcile_comments_count
+
+
+class Command(BaseCommand):
+    """
+    Fix 'Post.comments_count' values drifted from actual comment numbers.
+    """
+
+    help = 'Recompute drifted comment counters of posts in batches.'
+
+    def add_arguments(self, parser):
+        """
+        Add batch size option.
+        """
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of posts checked per query.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Run reconciliation and report number of fixed posts.
+        """
+        fixed = reconcile_comments_count(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled comment counters, {fixed} posts fixed.'
+        ))
@@ -0,0 +1,30 @@
+"""Management command recomputing denormalized follow counters."""
+from django.core.management.base import BaseCommand
+
+from api.counters import reconcile_follow_counts
+
+
+class Command(BaseCommand):
+    """
+    Fix 'models.FollowCounts' rows drifted from actual follow links.
+    """
+
+    help = 'Recompute drifted follower and following counters in batches.'
+
+    def add_arguments(self, parser):
+        """
+        Add batch size option.
+        """
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of users checked per query.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Run reconciliation and report number of fixed users.
+        """
+        fixed = reconcile_follow_counts(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled follow counters, {fixed} users fixed.'
+        ))
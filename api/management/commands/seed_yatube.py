@@ -0,0 +1,105 @@
+"""Management command generating a large synthetic dataset."""
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import User
+from api.seeding import USERNAME_PREFIX, seed_dataset
+
+DATASET_OPTIONS = ('users', 'groups', 'posts', 'comments', 'follows', 'seed',
+                   'chunk_size', 'batch_size')
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with users, groups, posts, comments and follows.
+
+    The same options and seed always produce the same rows, whatever the
+    number of workers.
+    """
+
+    help = 'Generate a deterministic synthetic dataset of any size.'
+
+    def add_arguments(self, parser):
+        """
+        Add dataset size, seed and write strategy options.
+        """
+        parser.add_argument(
+            '--users', type=int, default=10000,
+            help='Number of users.',
+        )
+        parser.add_argument(
+            '--groups', type=int, default=1000,
+            help='Number of groups.',
+        )
+        parser.add_argument(
+            '--posts', type=int, default=1000000,
+            help='Number of posts.',
+        )
+        parser.add_argument(
+            '--comments', type=int, default=2000000,
+            help='Number of comments.',
+        )
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Average number of followed authors per user.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random seed of the dataset.',
+        )
+        parser.add_argument(
+            '--password', default='seed-password',
+            help='Password of every generated user.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=20000,
+            help='Number of rows generated and committed per task.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Number of rows per INSERT statement.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Number of worker processes, 0 writes in this process.',
+        )
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='Keep indexes and search triggers updated while writing.',
+        )
+        parser.add_argument(
+            '--timelines', action='store_true',
+            help='Rebuild materialized timelines of the new follows.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Validate options, generate the dataset and report row counts.
+        """
+        if options['users'] < 1 and (options['posts'] or options['comments']):
+            raise CommandError('Posts and comments need at least one user.')
+        if options['comments'] and not options['posts']:
+            raise CommandError('Comments need at least one post.')
+        if min(options['chunk_size'], options['batch_size']) < 1:
+            raise CommandError('Chunk and batch sizes must be positive.')
+        if User.objects.filter(username=f'{USERNAME_PREFIX}0').exists():
+            raise CommandError('The database is seeded already.')
+        # Only picklable values are passed to worker processes.
+        dataset = {key: options[key] for key in DATASET_OPTIONS}
+        dataset['password_hash'] = make_password(options['password'])
+        start = time.perf_counter()
+        counts = seed_dataset(
+            dataset,
+            workers=options['workers'],
+            defer_indexes=not options['keep_indexes'],
+            log=self.stdout.write,
+        )
+        if options['timelines']:
+            call_command('rebuild_timelines', stdout=self.stdout)
+        rows = ', '.join(f'{count} {table}' for table, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {rows} in {time.perf_counter() - start:.1f}s.'
+        ))
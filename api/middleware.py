@@ -0,0 +1,179 @@
+"""Middleware of the 'api' app."""
+import time
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+from .database import (get_replicas, is_sticky, reads_replica,
+                       stick_to_primary, use_replica)
+from .profiling import (RequestProfile, current_profile, dump_profile,
+                        get_registry, install_query_recorder,
+                        start_sampled_profiler)
+
+
+def get_view(request):
+    """
+    Return view function resolved for the request path or None.
+    """
+    try:
+        return resolve(request.path_info,
+                       getattr(request, 'urlconf', None)).func
+    except Resolver404:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe API requests read replicas unless the client wrote recently.
+
+    A successful or redirected unsafe request pins its client to the
+    primary for a short window, so clients always read their own writes.
+    The middleware goes after 'AuthenticationMiddleware' to tell session
+    clients apart.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = use_replica.set(self.may_read_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        if self.must_stick(request, response):
+            stick_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        # Session users are loaded lazily with the sync ORM.
+        allowed = bool(get_replicas()) and await sync_to_async(
+            self.may_read_replica
+        )(request)
+        token = use_replica.set(allowed)
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        if self.must_stick(request, response):
+            await sync_to_async(stick_to_primary)(request)
+        return response
+
+    @staticmethod
+    def may_read_replica(request):
+        """
+        Return True if the request is allowed to read replicas.
+        """
+        return (bool(get_replicas())
+                and request.method in SAFE_METHODS
+                and reads_replica(get_view(request))
+                and not is_sticky(request))
+
+    @staticmethod
+    def must_stick(request, response):
+        """
+        Return True if the response completed a write of the client.
+        """
+        return bool(get_replicas()
+                    and request.method not in SAFE_METHODS
+                    and (status.is_success(response.status_code)
+                         or status.is_redirect(response.status_code)))
+
+
+class ProfilingMiddleware:
+    """
+    Record timings of every request into rolling metrics histograms.
+
+    Wall time, SQL queries and SQL time are recorded per resolved route,
+    together with serializer time measured by 'profiling.section'. A share
+    of requests is run under cProfile and dumped if slow. The middleware
+    removes itself unless 'API_PROFILING' is on.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'API_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_recorder,
+                                   dispatch_uid='api_profiling')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections of this thread may predate the signal receiver.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(None, connection)
+        profile, token, profiler, start = self.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration = self.finish_request(token, start)
+        self.record(request, profile, profiler, duration)
+        return response
+
+    async def __acall__(self, request):
+        profile, token, profiler, start = self.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration = self.finish_request(token, start)
+        self.record(request, profile, profiler, duration)
+        return response
+
+    @staticmethod
+    def start_request():
+        """
+        Return '(profile, context token, profiler, start)' of a request.
+        """
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        profiler = start_sampled_profiler()
+        return profile, token, profiler, time.perf_counter()
+
+    @staticmethod
+    def finish_request(token, start):
+        """
+        Detach the request's profile, return request duration.
+        """
+        duration = time.perf_counter() - start
+        current_profile.reset(token)
+        return duration
+
+    def record(self, request, profile, profiler, duration):
+        """
+        Dump sampled profile and record metrics of a finished request.
+        """
+        route = self.get_route(request)
+        if profiler is not None:
+            dump_profile(profiler, route, duration)
+        get_registry().observe_profile(route, request.method, duration,
+                                       profile)
+
+    @staticmethod
+    def get_route(request):
+        """
+        Return name of the resolved route or 'unresolved'.
+        """
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.view_name:
+            return 'unresolved'
+        return match.view_name
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_follow_counts(apps, schema_editor):
+    Follow = apps.get_model('api', 'Follow')
+    FollowCounts = apps.get_model('api', 'FollowCounts')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    def count(field):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(count=Count('pk')).values('count')
+        ), 0)
+
+    users = User.objects.filter(
+        Q(follower__isnull=False) | Q(following__isnull=False)
+    ).distinct().annotate(
+        followers=count('following'), follows=count('user')
+    ).values_list('pk', 'followers', 'follows')
+    FollowCounts.objects.bulk_create(
+        (FollowCounts(user_id=pk, followers_count=followers,
+                      following_count=follows)
+         for pk, followers, follows in users.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0012_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowCounts',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_counts', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Количество подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Количество подписок')),
+            ],
+            options={
+                'verbose_name': 'Счётчики подписок',
+                'verbose_name_plural': 'Счётчики подписок',
+            },
+        ),
+        migrations.RunPython(fill_follow_counts, migrations.RunPython.noop),
+    ]
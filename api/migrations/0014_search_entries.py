@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:03
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_followcounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentSearchEntry',
+            fields=[
+                ('comment', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='api.comment')),
+                ('text', api.models.FullTextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'api_comment_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PostSearchEntry',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='api.post')),
+                ('text', api.models.FullTextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'api_post_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -37,12 +37,31 @@ class Post(models.Model):
         null=True,
         verbose_name='Изображение',
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Варианты изображения',
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
 
     class Meta():
         """Adds meta-information."""
         ordering = ('-pub_date',)
         verbose_name_plural = 'Записи'
         verbose_name = 'Запись'
+        indexes = [
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_pub_date_id_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_pub_date_id_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_pub_date_id_idx'),
+        ]
 
     def __str__(self):
         """Return post's info."""
@@ -82,6 +101,10 @@ class Comment(models.Model):
         ordering = ('-created',)
         verbose_name_plural = 'Комментарии'
         verbose_name = 'Комментарий'
+        indexes = [
+            models.Index(fields=('post', '-created', '-id'),
+                         name='comment_post_created_id_idx'),
+        ]
 
     def __str__(self):
         """Return comments's info."""
@@ -151,8 +174,158 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=('user', 'following'),
                                     name='unique_follow_link'),
         ]
+        indexes = [
+            models.Index(fields=('following', 'user'),
+                         name='follow_following_user_idx'),
+        ]
 
     def __str__(self):
         """Return followers's info."""
         return (f'Follow "{self.following}", '
                 f'follower="{self.user}"')
+
+
+class FollowCounts(models.Model):
+    """
+    Stores denormalized follower and following counters of a user.
+
+    Related to :model:'auth.User'. Users without a row have no follows.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_counts',
+        verbose_name='Пользователь',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок',
+    )
+
+    class Meta():
+        """Adds meta-information."""
+        verbose_name_plural = 'Счётчики подписок'
+        verbose_name = 'Счётчики подписок'
+
+    def __str__(self):
+        """Return counters' info."""
+        return (f'{self.user}: {self.followers_count} followers, '
+                f'{self.following_count} following')
+
+
+class TimelineEntry(models.Model):
+    """
+    Stores a single post materialized in a follower's home timeline.
+
+    Related to :model:'auth.User' and :model:'posts.Post'.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Запись',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+    )
+
+    class Meta():
+        """Adds meta-information."""
+        ordering = ('-pub_date',)
+        verbose_name_plural = 'Записи ленты'
+        verbose_name = 'Запись ленты'
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'post'),
+                                    name='unique_timeline_entry'),
+        ]
+        indexes = [
+            models.Index(fields=('user', '-pub_date', '-post'),
+                         name='timeline_user_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        """Return timeline entry's info."""
+        return f'Post pk={self.post_id} in timeline of "{self.user}"'
+
+
+class FullTextField(models.TextField):
+    """
+    Column of an SQLite FTS5 table, filtered with 'match' lookup.
+    """
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    """
+    FTS5 'MATCH' of the column against a full-text query.
+    """
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class PostSearchEntry(models.Model):
+    """
+    Row of the FTS5 index of posts' text.
+
+    The table and its sync triggers are created by
+    'search.SqliteFtsSearchBackend', rows are joined by rowid.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry',
+    )
+    text = FullTextField()
+    rank = models.FloatField()
+
+    class Meta():
+        """Adds meta-information."""
+        managed = False
+        db_table = 'api_post_fts'
+
+
+class CommentSearchEntry(models.Model):
+    """
+    Row of the FTS5 index of comments' text.
+
+    The table and its sync triggers are created by
+    'search.SqliteFtsSearchBackend', rows are joined by rowid.
+    """
+
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_entry',
+    )
+    text = FullTextField()
+    rank = models.FloatField()
+
+    class Meta():
+        """Adds meta-information."""
+        managed = False
+        db_table = 'api_comment_fts'
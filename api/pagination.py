@@ -0,0 +1,270 @@
+"""DRF pagination classes of the 'api' app."""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_position(timestamp, pk):
+    """
+    Return opaque cursor of the '(timestamp, pk)' position.
+    """
+    raw = f'{timestamp.isoformat()}|{pk}'
+    return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+
+def decode_position(encoded):
+    """
+    Return '(timestamp, pk)' position of the cursor.
+
+    Raise ValueError for malformed cursor, naive timestamp or pk out of
+    the positive 64-bit range.
+    """
+    try:
+        raw = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+        timestamp, pk = raw.rsplit('|', 1)
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (BinasciiError, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if timestamp is None or is_naive(timestamp) or not 0 < pk < 2 ** 63:
+        raise ValueError('Invalid cursor')
+    return timestamp, pk
+
+
+def after_condition(field, position, pk_field='pk'):
+    """
+    Return condition of rows placed after the position in '(-field, -pk)'
+    order.
+
+    The range on 'field' comes first, so it is served by the index rows
+    are ordered by.
+    """
+    timestamp, pk = position
+    return Q(**{f'{field}__lte': timestamp}) & (
+        Q(**{f'{field}__lt': timestamp}) | Q(**{f'{pk_field}__lt': pk})
+    )
+
+
+def after_position(queryset, field, position):
+    """
+    Return rows placed after the position in '(-field, -pk)' order.
+    """
+    return queryset.filter(after_condition(field, position))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a '(timestamp, id)' pair.
+
+    Every page is fetched with an indexed range condition instead of OFFSET,
+    so page N costs the same as page 1 and rows inserted at the head of the
+    list do not shift the pages a client is walking through.
+
+    Pagination is opt-in: the full list is returned unless the request
+    contains 'cursor' or 'limit' query parameter.
+    """
+
+    ordering_field = 'pub_date'
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return a single page of results or None if pagination is off.
+        """
+        params = request.query_params
+        if (self.cursor_query_param not in params
+                and self.page_size_query_param not in params):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = self.order_queryset(queryset)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = self.filter_after(queryset, position)
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def paginate_rows(self, rows, request, has_more):
+        """
+        Return the first page cut from rows already in page order.
+
+        'has_more' tells whether more rows follow the given ones. Return None
+        if the rows do not cover the requested page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if self.page_size > len(rows) and has_more:
+            return None
+        self.has_next = len(rows) > self.page_size or has_more
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def order_queryset(self, queryset):
+        """
+        Return queryset in page order.
+        """
+        return queryset.order_by(f'-{self.ordering_field}', '-pk')
+
+    def filter_after(self, queryset, position):
+        """
+        Return rows of the queryset placed after the position.
+        """
+        return after_position(queryset, self.ordering_field, position)
+
+    def get_page_size(self, request):
+        """
+        Return page size requested by client, bounded by 'max_page_size'.
+        """
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        """
+        Return '(timestamp, pk)' position encoded in the request's cursor.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return self.parse_position(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def parse_position(encoded):
+        """
+        Return position of the encoded cursor, raise ValueError if invalid.
+        """
+        return decode_position(encoded)
+
+    def encode_cursor(self, instance):
+        """
+        Return cursor pointing right after the given instance or row.
+        """
+        if isinstance(instance, dict):
+            return encode_position(instance[self.ordering_field],
+                                   instance['id'])
+        return encode_position(getattr(instance, self.ordering_field),
+                               instance.pk)
+
+    def get_next_link(self):
+        """
+        Return URL of the next page or None on the last one.
+        """
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param,
+                                  self.page_size)
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        """
+        Return URL of the first page.
+        """
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        """
+        Wrap page data with navigation links.
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        """
+        Describe paginated response for schema generators.
+        """
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class IdKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination over one ascending integer column.
+
+    Used for lists without a timestamp, such as followers, whose rows come
+    in id order straight from an index. 'ordering_field' names the column,
+    rows must contain it.
+    """
+
+    ordering_field = 'pk'
+
+    def order_queryset(self, queryset):
+        """
+        Return queryset in ascending 'ordering_field' order.
+        """
+        return queryset.order_by(self.ordering_field)
+
+    def filter_after(self, queryset, position):
+        """
+        Return rows with 'ordering_field' above the position.
+        """
+        return queryset.filter(**{f'{self.ordering_field}__gt': position})
+
+    @staticmethod
+    def parse_position(encoded):
+        """
+        Return id of the encoded cursor, raise ValueError if invalid or out
+        of the 64-bit range.
+        """
+        try:
+            raw = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            position = int(raw)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise ValueError('Invalid cursor')
+        if not 0 <= position < 2 ** 63:
+            raise ValueError('Invalid cursor')
+        return position
+
+    def encode_cursor(self, instance):
+        """
+        Return cursor pointing right after the given instance or row.
+        """
+        if isinstance(instance, dict):
+            value = instance[self.ordering_field]
+        else:
+            value = getattr(instance, self.ordering_field)
+        return urlsafe_b64encode(str(value).encode('ascii')).decode('ascii')
+
+
+class RankedPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination keeping queryset order, used for ranked results.
+
+    Pagination is opt-in: the full list is returned unless the request
+    contains 'limit' query parameter.
+    """
+
+    default_limit = None
+    max_limit = 100
@@ -0,0 +1,37 @@
+"""DRF parser classes of the 'api' app."""
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+UTF8 = ('utf-8', 'utf8')
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in 'JSONParser' decoding with orjson when it is installed.
+
+    orjson only reads UTF-8 and rejects NaN and Infinity, so the stdlib
+    decoder of the parent is used for other charsets and when
+    'STRICT_JSON' is turned off.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Override parse function.
+
+        Decode request body with orjson if possible.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        encoding = encoding.lower().replace('_', '-')
+        if orjson is None or not self.strict or encoding not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
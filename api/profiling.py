@@ -0,0 +1,264 @@
+"""Request profiling and metrics of the 'api' app."""
+import cProfile
+import os
+import random
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+
+from django.conf import settings
+
+
+# Profile of the request being handled, None when profiling is off.
+current_profile = ContextVar('current_profile', default=None)
+
+METRICS = {
+    'request_duration_seconds': (
+        'Wall time of API requests.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    'sql_queries': (
+        'Number of SQL queries per API request.',
+        (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    ),
+    'sql_duration_seconds': (
+        'Total SQL time per API request.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+    ),
+    'serializer_duration_seconds': (
+        'Total serializer time per API request.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+    ),
+}
+
+METRIC_PREFIX = 'yatube_api_'
+
+
+class RequestProfile:
+    """
+    Timings collected while handling one request.
+    """
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+
+
+@contextmanager
+def section(name):
+    """
+    Add time spent in the block to '<name>_time' of the current profile.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(profile, f'{name}_time',
+                getattr(profile, f'{name}_time') + time.perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting queries of the current profile.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.sql_queries += 1
+        profile.sql_time += time.perf_counter() - start
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Add 'record_query' to execute wrappers of the connection once.
+
+    Also a 'connection_created' receiver. The wrapper stays installed, it
+    does nothing outside profiled requests, so queries run in any thread,
+    including async ORM calls, are counted.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RollingHistogram:
+    """
+    Histogram of the observations made during the last 'window' seconds.
+
+    The window is split into 'slots' ring buffer slots, the oldest slot is
+    recycled when the clock moves into it, so memory stays constant.
+    """
+
+    def __init__(self, buckets, window=300, slots=5):
+        self.buckets = tuple(buckets)
+        self.span = window / slots
+        self.slots = [None] * slots
+
+    def observe(self, value, now=None):
+        """
+        Count the value in its bucket of the current slot.
+        """
+        epoch = int((time.time() if now is None else now) // self.span)
+        index = epoch % len(self.slots)
+        slot = self.slots[index]
+        if slot is None or slot[0] != epoch:
+            slot = self.slots[index] = [epoch, [0] * (len(self.buckets) + 1),
+                                        0.0, 0]
+        slot[1][bisect_left(self.buckets, value)] += 1
+        slot[2] += value
+        slot[3] += 1
+
+    def snapshot(self, now=None):
+        """
+        Return '(cumulative bucket counts, sum, count)' of the window.
+        """
+        epoch = int((time.time() if now is None else now) // self.span)
+        counts = [0] * (len(self.buckets) + 1)
+        total, count = 0.0, 0
+        for slot in self.slots:
+            if slot is None or slot[0] <= epoch - len(self.slots):
+                continue
+            for index, value in enumerate(slot[1]):
+                counts[index] += value
+            total += slot[2]
+            count += slot[3]
+        for index in range(1, len(counts)):
+            counts[index] += counts[index - 1]
+        return counts, total, count
+
+
+def escape_label(value):
+    """
+    Return label value escaped for Prometheus text format.
+    """
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+class MetricsRegistry:
+    """
+    Rolling histograms of 'METRICS' labelled by route and method.
+    """
+
+    def __init__(self, window=300, slots=5):
+        self.window = window
+        self.slots = slots
+        self._histograms = {}
+        self._lock = Lock()
+
+    def observe(self, metric, labels, value):
+        """
+        Record value of the metric with '(route, method)' labels.
+        """
+        key = (metric, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = RollingHistogram(
+                    METRICS[metric][1], self.window, self.slots
+                )
+            histogram.observe(value)
+
+    def observe_profile(self, route, method, duration, profile):
+        """
+        Record all metrics of a finished request.
+        """
+        labels = (route, method)
+        self.observe('request_duration_seconds', labels, duration)
+        self.observe('sql_queries', labels, profile.sql_queries)
+        self.observe('sql_duration_seconds', labels, profile.sql_time)
+        self.observe('serializer_duration_seconds', labels,
+                     profile.serializer_time)
+
+    def clear(self):
+        """
+        Drop all recorded observations.
+        """
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """
+        Return all histograms in Prometheus text exposition format.
+        """
+        with self._lock:
+            snapshots = {
+                key: (histogram.buckets, histogram.snapshot())
+                for key, histogram in self._histograms.items()
+            }
+        lines = []
+        for metric, (help_text, _) in METRICS.items():
+            name = f'{METRIC_PREFIX}{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (key_metric, (route, method)), value in sorted(
+                    snapshots.items()):
+                if key_metric != metric:
+                    continue
+                buckets, (counts, total, count) = value
+                labels = (f'route="{escape_label(route)}",'
+                          f'method="{escape_label(method)}"')
+                bounds = [repr(float(bound)) for bound in buckets] + ['+Inf']
+                for bound, bucket_count in zip(bounds, counts):
+                    bucket_labels = f'{labels},le="{bound}"'
+                    lines.append(f'{name}_bucket{{{bucket_labels}}} '
+                                 f'{bucket_count}')
+                lines.append(f'{name}_sum{{{labels}}} {total}')
+                lines.append(f'{name}_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=None)
+def get_registry():
+    """
+    Return metrics registry of the process.
+    """
+    return MetricsRegistry(
+        window=getattr(settings, 'API_PROFILING_WINDOW', 300),
+    )
+
+
+def start_sampled_profiler():
+    """
+    Return running cProfile profiler for a sampled share of requests.
+
+    Return None if dumps are off or the request is not sampled.
+    """
+    rate = getattr(settings, 'API_PROFILING_SAMPLE_RATE', 0)
+    if not rate or random.random() >= rate:
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another request of the process is being profiled already.
+        return None
+    return profiler
+
+
+def dump_profile(profiler, route, duration):
+    """
+    Save stats of a request slower than 'API_PROFILING_SLOW_SECONDS'.
+
+    Return path of the dump or None for fast requests.
+    """
+    profiler.disable()
+    if duration < getattr(settings, 'API_PROFILING_SLOW_SECONDS', 1):
+        return None
+    directory = getattr(settings, 'API_PROFILING_DUMP_DIR',
+                        os.path.join(settings.BASE_DIR, '.profiles'))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{route}-{time.time_ns()}.prof')
+    profiler.dump_stats(path)
+    return path
@@ -0,0 +1,94 @@
+"""DRF renderer classes of the 'api' app."""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# DRF escapes these separators so the output stays a JavaScript subset.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+def escape_separators(content):
+    """
+    Return JSON bytes with U+2028 and U+2029 escaped like DRF does.
+    """
+    for raw, escaped in LINE_SEPARATORS:
+        if raw in content:
+            content = content.replace(raw, escaped)
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in 'JSONRenderer' serializing with orjson when it is installed.
+
+    orjson encodes datetimes, dates, times and UUIDs natively, other types
+    go through 'encoder_class'. Output is byte-identical to 'JSONRenderer'
+    for serializer data. Raw datetimes are written with microseconds,
+    while DRF's encoder truncates them to milliseconds.
+
+    The stdlib encoder of the parent is used without orjson, for indented
+    output and when 'UNICODE_JSON', 'COMPACT_JSON' or 'STRICT_JSON' are
+    turned off, since orjson output is always compact, unicode and strict.
+    """
+
+    def use_orjson(self, accepted_media_type, renderer_context):
+        """
+        Return True if the data can be serialized with orjson.
+        """
+        return (
+            orjson is not None
+            and not self.ensure_ascii and self.compact and self.strict
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Override render function.
+
+        Serialize data with orjson if possible.
+        """
+        if data is None:
+            return b''
+        if not self.use_orjson(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # Integers above 64 bits and the like, the stdlib copes with them.
+            return super().render(data, accepted_media_type, renderer_context)
+        return escape_separators(content)
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Renderer of Prometheus text exposition format.
+    """
+
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Return metrics text, errors are rendered as their detail.
+        """
+        if isinstance(data, dict):
+            data = f'{data.get("detail", data)}\n'
+        return data.encode(self.charset)
+
+
+def render_json(data):
+    """
+    Return data rendered to JSON bytes by the configured renderer.
+    """
+    return FastJSONRenderer().render(data)
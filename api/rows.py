@@ -0,0 +1,82 @@
+"""Plain-dict rendering of '.values()' rows of the 'api' app."""
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+
+# Rows are rendered in the shape of the app's DRF serializers, so read-only
+# paths can skip serializer field machinery.
+POST_VALUES = ('id', 'author__username', 'image', 'image_variants', 'text',
+               'pub_date', 'comments_count')
+COMMENT_VALUES = ('id', 'author__username', 'text', 'created', 'post')
+GROUP_VALUES = ('id', 'title', 'slug', 'description')
+
+
+def format_datetime(value):
+    """
+    Return ISO 8601 representation used by DRF 'DateTimeField'.
+    """
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def file_url(name, request=None):
+    """
+    Return absolute URL of a stored file or None if there is no file.
+    """
+    if not name:
+        return None
+    url = default_storage.url(name)
+    if request is not None:
+        url = request.build_absolute_uri(url)
+    return url
+
+
+def post_row(row, request=None):
+    """
+    Return 'PostSerializer' representation of a post row.
+    """
+    return {
+        'id': row['id'],
+        'author': row['author__username'],
+        'image': file_url(row['image'], request),
+        'image_variants': {
+            name: file_url(path, request)
+            for name, path in row['image_variants'].items()
+        },
+        'text': row['text'],
+        'pub_date': format_datetime(row['pub_date']),
+        'comments_count': row['comments_count'],
+    }
+
+
+def comment_row(row, request=None):
+    """
+    Return 'CommentSerializer' representation of a comment row.
+    """
+    return {
+        'id': row['id'],
+        'author': row['author__username'],
+        'text': row['text'],
+        'created': format_datetime(row['created']),
+        'post': row['post'],
+    }
+
+
+def group_row(row, request=None):
+    """
+    Return 'GroupSerializer' representation of a group row.
+    """
+    return dict(row)
+
+
+def user_row(row, request=None):
+    """
+    Return representation of a user row of follow lists.
+    """
+    return {'username': row['username']}
@@ -0,0 +1,170 @@
+"""Full-text search backends of the 'api' app."""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class ContainsSearchBackend:
+    """
+    Fallback backend matching all query words with 'icontains'.
+
+    Works on any database but scans the whole table.
+    """
+
+    def search(self, queryset, field, query):
+        """
+        Return queryset filtered by all words of the query.
+        """
+        words = TOKEN_RE.findall(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(**{f'{field}__icontains': word})
+        return queryset.order_by('-pk')
+
+
+class SqliteFtsSearchBackend:
+    """
+    SQLite FTS5 backend over external-content virtual tables.
+
+    Every searchable '<table>.<field>' gets a '<table>_fts' index kept in
+    sync by triggers and mapped by the model's 'search_entry' relation,
+    results are ordered by bm25 rank.
+    """
+
+    @staticmethod
+    def get_fts_table(model):
+        """
+        Return name of the model's FTS5 table.
+        """
+        return f'{model._meta.db_table}_fts'
+
+    def install(self, model, field, cursor):
+        """
+        Create FTS5 table and sync triggers if they are missing.
+
+        Return True if the index had to be (re)built.
+        """
+        table = model._meta.db_table
+        fts = self.get_fts_table(model)
+        column = model._meta.get_field(field).column
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE %s",
+            [f'{fts}_%'],
+        )
+        if cursor.fetchone()[0] == 3:
+            return False
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5('
+            f"{column}, content='{table}', content_rowid='id')"
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} '
+            f'BEGIN INSERT INTO {fts}(rowid, {column}) '
+            f'VALUES (new.id, new.{column}); END'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} '
+            f'BEGIN INSERT INTO {fts}({fts}, rowid, {column}) '
+            f"VALUES ('delete', old.id, old.{column}); END"
+        )
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au '
+            f'AFTER UPDATE OF {column} ON {table} '
+            f'BEGIN INSERT INTO {fts}({fts}, rowid, {column}) '
+            f"VALUES ('delete', old.id, old.{column}); "
+            f'INSERT INTO {fts}(rowid, {column}) '
+            f'VALUES (new.id, new.{column}); END'
+        )
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        return True
+
+    def uninstall(self, model, cursor):
+        """
+        Drop sync triggers, so bulk inserts skip the index.
+
+        The next 'install' recreates the triggers and rebuilds the index.
+        """
+        fts = self.get_fts_table(model)
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+
+    def search(self, queryset, field, query):
+        """
+        Return queryset of rows matching all query words, best first.
+
+        Rows are joined to the model's 'search_entry' by rowid, so the FTS5
+        index yields matches with their bm25 rank in a single query.
+        """
+        words = TOKEN_RE.findall(query)
+        if not words:
+            return queryset.none()
+        match = ' '.join('"{}"'.format(word) for word in words)
+        return queryset.filter(
+            **{f'search_entry__{field}__match': match}
+        ).annotate(
+            search_rank=F('search_entry__rank'),
+        ).order_by('search_rank', '-pk')
+
+
+def get_search_backend():
+    """
+    Return backend configured with 'API_SEARCH_BACKEND' setting.
+    """
+    default = 'api.search.ContainsSearchBackend'
+    if connection.vendor == 'sqlite':
+        default = 'api.search.SqliteFtsSearchBackend'
+    return import_string(getattr(settings, 'API_SEARCH_BACKEND', default))()
+
+
+def install_search_indexes(sender, using='default', **kwargs):
+    """
+    Create missing full-text indexes after migrations.
+
+    Tables are remade by some SQLite schema changes, which drops triggers,
+    so the check runs after every migrate.
+    """
+    from django.db import connections
+
+    from .models import Comment, Post
+
+    backend = get_search_backend()
+    if not hasattr(backend, 'install'):
+        return
+    with connections[using].cursor() as cursor:
+        for model in (Post, Comment):
+            backend.install(model, 'text', cursor)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Filter backend searching 'search_field' of the view with 'search' param.
+    """
+
+    search_param = 'search'
+
+    @classmethod
+    def get_query(cls, request):
+        """
+        Return stripped search query of the request.
+        """
+        return request.query_params.get(cls.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Return ranked search results or untouched queryset without query.
+        """
+        query = self.get_query(request)
+        if not query:
+            return queryset
+        return get_search_backend().search(
+            queryset, getattr(view, 'search_field', 'text'), query
+        )
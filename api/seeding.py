@@ -0,0 +1,360 @@
+"""Deterministic synthetic dataset generation of the 'api' app."""
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection, connections, router, transaction
+from django.db.models import Count, Index, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .counters import reconcile_follow_counts
+from .models import Comment, Follow, Group, Post, User
+from .search import get_search_backend
+
+
+WORDS = (
+    'яндекс', 'практикум', 'питон', 'джанго', 'запрос', 'ответ', 'данные',
+    'сервер', 'клиент', 'база', 'индекс', 'кэш', 'очередь', 'поток', 'лента',
+    'подписка', 'группа', 'запись', 'комментарий', 'автор', 'новость',
+    'день', 'вечер', 'утро', 'город', 'дорога', 'книга', 'музыка', 'кино',
+    'погода', 'работа', 'отпуск', 'море', 'горы', 'кофе', 'чай', 'код',
+)
+
+USERNAME_PREFIX = 'seed_user_'
+
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+# Models whose non-unique indexes and search triggers are dropped while
+# their rows are inserted and rebuilt once afterwards.
+INDEXED_MODELS = (Post, Comment, Follow)
+
+
+def get_random(seed, table, chunk):
+    """
+    Return random generator of one chunk of the table.
+
+    Chunks are generated independently, so the data does not depend on
+    the number of workers or on the order chunks are written in.
+    """
+    return random.Random(f'{seed}:{table}:{chunk}')
+
+
+def get_text(rng, low, high):
+    """
+    Return text of random words.
+    """
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+
+
+def get_offsets():
+    """
+    Return current maximal primary keys of the seeded tables.
+
+    Generated rows get explicit primary keys above them, so workers can
+    reference rows written by other workers.
+    """
+    offsets = {}
+    for model in (User, Group, Post, Comment, Follow):
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        offsets[model._meta.label_lower] = last.first() or 0
+    return offsets
+
+
+def get_ids(offsets, label, count):
+    """
+    Return ids of 'count' rows generated above the offset of the model.
+    """
+    return range(offsets[label] + 1, offsets[label] + count + 1)
+
+
+def build_users(rng, start, stop, offsets, options):
+    """
+    Return users sharing one pre-hashed password.
+    """
+    password = options['password_hash']
+    prefix = options.get('username_prefix', USERNAME_PREFIX)
+    return [
+        User(pk=offsets['auth.user'] + i + 1,
+             username=f'{prefix}{i}', password=password)
+        for i in range(start, stop)
+    ]
+
+
+def build_groups(rng, start, stop, offsets, options):
+    """
+    Return groups with random descriptions.
+    """
+    return [
+        Group(pk=offsets['api.group'] + i + 1, title=f'Группа {i}',
+              slug=f'seed-group-{i}', description=get_text(rng, 5, 20))
+        for i in range(start, stop)
+    ]
+
+
+def build_posts(rng, start, stop, offsets, options):
+    """
+    Return posts of 'user_ids' published a minute apart, some of them
+    outside 'group_ids'.
+    """
+    user_ids, group_ids = options['user_ids'], options['group_ids']
+    posts = []
+    for i in range(start, stop):
+        group = rng.randrange(len(group_ids) + 1)
+        posts.append(Post(
+            pk=offsets['api.post'] + i + 1,
+            text=get_text(rng, 5, 80),
+            pub_date=START_DATE + timedelta(minutes=i,
+                                            seconds=rng.randrange(60)),
+            author_id=rng.choice(user_ids),
+            group_id=group_ids[group - 1] if group else None,
+        ))
+    return posts
+
+
+def build_comments(rng, start, stop, offsets, options):
+    """
+    Return comments of random 'post_ids' written within a day of the post.
+    """
+    user_ids, post_ids = options['user_ids'], options['post_ids']
+    comments = []
+    for i in range(start, stop):
+        post = rng.randrange(len(post_ids))
+        comments.append(Comment(
+            pk=offsets['api.comment'] + i + 1,
+            text=get_text(rng, 3, 30),
+            created=START_DATE + timedelta(minutes=post,
+                                           seconds=60 + rng.randrange(86400)),
+            author_id=rng.choice(user_ids),
+            post_id=post_ids[post],
+        ))
+    return comments
+
+
+def build_follows(rng, start, stop, offsets, options):
+    """
+    Return follows of 'user_ids' from 'start' to 'stop', 'follows' per user
+    on average.
+    """
+    user_ids, average = options['user_ids'], options['follows']
+    follows = []
+    for user in range(start, stop):
+        count = min(rng.randint(0, 2 * average), len(user_ids) - 1)
+        for following in rng.sample(range(len(user_ids) - 1), count):
+            # Skip the user itself by shifting the upper part of the range.
+            following += following >= user
+            follows.append(Follow(user_id=user_ids[user],
+                                  following_id=user_ids[following]))
+    return follows
+
+
+def insert_rows(model, rows, batch_size):
+    """
+    Insert rows in batches exactly as built, return number of rows.
+
+    Rows are written with one 'executemany' INSERT per batch, as when
+    loading fixtures no 'pre_save' runs, so 'auto_now_add' dates set by
+    the builders are kept. Primary keys are left to the database if the
+    rows have none.
+    """
+    if not rows:
+        return 0
+    fields = [field for field in model._meta.local_concrete_fields
+              if not field.primary_key or rows[0].pk is not None]
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    sql = (f'INSERT INTO {quote(model._meta.db_table)} '
+           f'({", ".join(quote(field.column) for field in fields)}) '
+           f'VALUES ({", ".join(["%s"] * len(fields))})')
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, [
+                [field.get_db_prep_save(getattr(row, field.attname),
+                                        connection) for field in fields]
+                for row in rows[start:start + batch_size]
+            ])
+    return len(rows)
+
+
+# Table name, model, builder and option holding the number of items.
+# Follows are generated per follower, so their items are users.
+TABLES = {
+    'users': (User, build_users, 'users'),
+    'groups': (Group, build_groups, 'groups'),
+    'posts': (Post, build_posts, 'posts'),
+    'comments': (Comment, build_comments, 'comments'),
+    'follows': (Follow, build_follows, 'users'),
+}
+
+# Tables of one phase only reference tables of previous phases.
+PHASES = (('users', 'groups'), ('posts',), ('comments', 'follows'))
+
+
+def get_chunks(table, options):
+    """
+    Return '(table, chunk, start, stop)' tasks covering the table.
+    """
+    total = options[TABLES[table][2]]
+    size = options['chunk_size']
+    return [
+        (table, number, start, min(start + size, total))
+        for number, start in enumerate(range(0, total, size))
+    ]
+
+
+def write_chunk(task, offsets, options):
+    """
+    Generate and insert rows of one chunk, return number of rows.
+    """
+    table, number, start, stop = task
+    model, build, _ = TABLES[table]
+    rows = build(get_random(options['seed'], table, number), start, stop,
+                 offsets, options)
+    with transaction.atomic(using=router.db_for_write(model)):
+        return insert_rows(model, rows, options['batch_size'])
+
+
+# Seconds a SQLite worker waits for other workers to commit their chunks.
+SQLITE_WORKER_TIMEOUT = 600
+
+
+def init_worker():
+    """
+    Set Django up in a worker process and let it queue for the database.
+
+    SQLite has a single writer, so workers generate rows concurrently but
+    commit them one after another.
+    """
+    import django
+
+    django.setup()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'PRAGMA busy_timeout = {SQLITE_WORKER_TIMEOUT * 1000}'
+            )
+
+
+def run_worker_chunk(args):
+    """
+    Pool entry point of 'write_chunk'.
+    """
+    return write_chunk(*args)
+
+
+def count_comments(posts):
+    """
+    Set 'comments_count' of the posts of a queryset with one UPDATE.
+    """
+    counts = Comment.objects.filter(post=OuterRef('pk')).order_by()\
+        .values('post').annotate(total=Count('pk')).values('total')
+    return posts.update(
+        comments_count=Coalesce(Subquery(counts), 0)
+    )
+
+
+def get_secondary_indexes(model):
+    """
+    Return non-unique indexes of the model's table found by introspection.
+
+    Covers 'Meta.indexes' as well as indexes of foreign keys and
+    'db_index' fields. Columns are mapped back to field names, so the
+    indexes can be recreated with the schema editor.
+    """
+    names = {field.column: field.name
+             for field in model._meta.local_concrete_fields}
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    indexes = []
+    for name, constraint in constraints.items():
+        if (not constraint['index'] or constraint['unique']
+                or constraint['primary_key']):
+            continue
+        columns = constraint['columns']
+        orders = constraint.get('orders') or ['ASC'] * len(columns)
+        fields = [('-' if order == 'DESC' else '') + names[column]
+                  for column, order in zip(columns, orders)]
+        indexes.append(Index(fields=fields, name=name))
+    return indexes
+
+
+@contextmanager
+def deferred_indexes(models):
+    """
+    Drop secondary indexes and search triggers of models while inserting.
+
+    Every non-unique index of the tables is dropped, including indexes of
+    foreign keys. Indexes and triggers are rebuilt in one pass on exit,
+    which is much faster than updating them row by row.
+    """
+    backend = get_search_backend()
+    indexes = {model: get_secondary_indexes(model) for model in models}
+    with connection.schema_editor() as editor:
+        for model, model_indexes in indexes.items():
+            for index in model_indexes:
+                editor.remove_index(model, index)
+    if hasattr(backend, 'uninstall'):
+        with connection.cursor() as cursor:
+            for model in (Post, Comment):
+                backend.uninstall(model, cursor)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model, model_indexes in indexes.items():
+                for index in model_indexes:
+                    editor.add_index(model, index)
+        if hasattr(backend, 'install'):
+            with connection.cursor() as cursor:
+                for model in (Post, Comment):
+                    backend.install(model, 'text', cursor)
+
+
+def seed_dataset(options, workers=0, defer_indexes=True, log=None):
+    """
+    Generate the dataset described by options, return rows per table.
+
+    Tables are written phase by phase, chunks of a phase are spread over
+    'workers' processes if there are more than one. Comment and follow
+    counters are set at the end.
+    """
+    offsets = get_offsets()
+    options = {
+        **options,
+        'user_ids': get_ids(offsets, 'auth.user', options['users']),
+        'group_ids': get_ids(offsets, 'api.group', options['groups']),
+        'post_ids': get_ids(offsets, 'api.post', options['posts']),
+    }
+    counts = Counter()
+    context = nullcontext()
+    if defer_indexes:
+        context = deferred_indexes(INDEXED_MODELS)
+    with context:
+        for phase in PHASES:
+            tasks = [task for table in phase
+                     for task in get_chunks(table, options)]
+            if workers > 1:
+                # Connections must not be shared with forked workers.
+                connections.close_all()
+                with ProcessPoolExecutor(workers,
+                                         initializer=init_worker) as pool:
+                    results = list(pool.map(
+                        run_worker_chunk,
+                        [(task, offsets, options) for task in tasks],
+                    ))
+            else:
+                results = [write_chunk(task, offsets, options)
+                           for task in tasks]
+            for task, rows in zip(tasks, results):
+                counts[task[0]] += rows
+            if log is not None:
+                log(', '.join(f'{table}: {counts[table]}'
+                              for table in phase))
+    # Generated comments only belong to generated posts, so older posts
+    # keep their counters.
+    count_comments(Post.objects.filter(pk__gt=offsets['api.post']))
+    reconcile_follow_counts()
+    return counts
@@ -1,28 +1,107 @@
 """Serializers of the 'api' app."""
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 from api.models import Comment, Follow, Group, Post, User
+from api.profiling import section
 
 
-class PostSerializer(serializers.ModelSerializer):
+class ProfiledListSerializer(serializers.ListSerializer):
+    """
+    'ListSerializer' adding representation time to the request profile.
+    """
+
+    @property
+    def data(self):
+        with section('serializer'):
+            return super().data
+
+
+class ProfiledModelSerializer(serializers.ModelSerializer):
+    """
+    'ModelSerializer' adding representation time to the request profile.
+    """
+
+    @property
+    def data(self):
+        with section('serializer'):
+            return super().data
+
+
+class BulkCreateListSerializer(ProfiledListSerializer):
+    """
+    'ListSerializer' saving all items with chunked 'bulk_create'.
+    """
+
+    def to_internal_value(self, data):
+        """
+        Reject too long batches before validating their items.
+        """
+        max_items = getattr(settings, 'BULK_CREATE_MAX_ITEMS', 1000)
+        if isinstance(data, list) and len(data) > max_items:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    f'Ensure this list has no more than {max_items} items.'
+                ]
+            })
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        """
+        Insert all validated items in one transaction.
+        """
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            return model.objects.bulk_create(
+                objs,
+                batch_size=getattr(settings, 'BULK_CREATE_BATCH_SIZE', 500),
+            )
+
+
+class PostSerializer(ProfiledModelSerializer):
     """
     'ModelSerializer' for 'models.Post' objects.
     """
     author = serializers.SlugRelatedField(slug_field='username',
                                           read_only=True)
+    image = serializers.ImageField(required=False, allow_null=True)
+    image_variants = serializers.SerializerMethodField()
+    group = serializers.PrimaryKeyRelatedField(
+        queryset=Group.objects.all(), required=False, allow_null=True,
+        write_only=True,
+    )
 
     class Meta:
         """Adds meta-information."""
 
         # здесь не можем воспользоваться fields = '__all__', так как
         # в документации Redoc явно указаны поля, которые необходимо
-        # вернуть, поля 'group' и 'image' в ответ не включаются.
-        exclude = ('group', 'image')
+        # вернуть, поле 'group' в ответ не включается, оно доступно
+        # только для записи.
+        fields = ('id', 'author', 'image', 'image_variants', 'text',
+                  'pub_date', 'comments_count', 'group')
         model = Post
+        list_serializer_class = BulkCreateListSerializer
+
+    def get_image_variants(self, obj):
+        """
+        Return URLs of resized image variants.
+        """
+        request = self.context.get('request')
+        variants = {}
+        for name, path in obj.image_variants.items():
+            url = default_storage.url(path)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            variants[name] = url
+        return variants
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ProfiledModelSerializer):
     """
     'ModelSerializer' for 'models.Comment' objects.
     """
@@ -36,9 +115,10 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('author', 'post')
         model = Comment
+        list_serializer_class = BulkCreateListSerializer
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(ProfiledModelSerializer):
     """
     'ModelSerializer' for 'models.Group' objects.
     """
@@ -48,9 +128,10 @@ class GroupSerializer(serializers.ModelSerializer):
 
         fields = '__all__'
         model = Group
+        list_serializer_class = ProfiledListSerializer
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(ProfiledModelSerializer):
     """
     'ModelSerializer' for 'models.Follow' objects.
     """
@@ -64,6 +145,7 @@ class FollowSerializer(serializers.ModelSerializer):
         """Adds meta-information."""
         fields = '__all__'
         model = Follow
+        list_serializer_class = ProfiledListSerializer
         validators = [
             UniqueTogetherValidator(
                 queryset=Follow.objects.all(),
@@ -0,0 +1,215 @@
+"""Token bucket request throttling of the 'api' app."""
+import time
+from functools import lru_cache, wraps
+from math import ceil
+from threading import Lock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .caching import get_cache
+from .lru import LRUCache
+from .renderers import render_json
+
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Return '(capacity, tokens per second)' of a DRF '<number>/<period>' rate.
+    """
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def refill(bucket, capacity, rate, now):
+    """
+    Take a token from the '(tokens, timestamp)' bucket.
+
+    Return '(bucket, wait)' where wait is zero if the token was taken and
+    seconds until the next token otherwise.
+    """
+    tokens, stamp = bucket or (capacity, now)
+    tokens = min(capacity, tokens + max(now - stamp, 0) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class MemoryBucketStore:
+    """
+    Per-process token buckets kept in an LRU bounded mapping.
+
+    An evicted bucket is simply full again, so the bound only makes the
+    throttle more lenient towards the least active clients.
+    """
+
+    def __init__(self, maxsize=100000):
+        self._buckets = LRUCache(maxsize)
+        self._lock = Lock()
+
+    def take(self, key, capacity, rate):
+        """
+        Take a token from the bucket, return seconds to wait if empty.
+        """
+        with self._lock:
+            bucket, wait = refill(self._buckets.get(key), capacity, rate,
+                                  time.monotonic())
+            self._buckets.set(key, bucket)
+        return wait
+
+    def clear(self):
+        """
+        Refill all buckets.
+        """
+        self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Token buckets shared between processes through the API cache.
+
+    Buckets expire once they would be full again. Read and write are not
+    atomic, so concurrent requests of one client may slightly overshoot
+    the rate. Size of the store is bounded by the cache itself.
+    """
+
+    def __init__(self, maxsize=None):
+        self.cache = get_cache()
+
+    def take(self, key, capacity, rate):
+        """
+        Take a token from the bucket, return seconds to wait if empty.
+        """
+        bucket, wait = refill(self.cache.get(key), capacity, rate,
+                              time.time())
+        self.cache.set(key, bucket, int((capacity - bucket[0]) / rate) + 1)
+        return wait
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    """
+    Return bucket store configured with 'API_THROTTLE_STORE' setting.
+    """
+    store_class = import_string(getattr(
+        settings, 'API_THROTTLE_STORE', 'api.throttling.MemoryBucketStore'
+    ))
+    return store_class(
+        maxsize=getattr(settings, 'API_THROTTLE_STORE_SIZE', 100000)
+    )
+
+
+def get_rate(scope):
+    """
+    Return '(capacity, tokens per second)' configured for the scope.
+    """
+    try:
+        return parse_rate(api_settings.DEFAULT_THROTTLE_RATES[scope])
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"No default throttle rate set for '{scope}' scope"
+        )
+
+
+def take_token(scope, user, ident):
+    """
+    Take a token of the scope's bucket of the user or client address.
+
+    Return seconds to wait if the bucket is empty, zero otherwise.
+    """
+    if user is not None and user.is_authenticated:
+        key = f'api:throttle:{scope}:user:{user.pk}'
+    else:
+        key = f'api:throttle:{scope}:ip:{ident}'
+    capacity, rate = get_rate(scope)
+    return get_store().take(key, capacity, rate)
+
+
+class BucketRateThrottle(BaseThrottle):
+    """
+    Token bucket throttle of 'scope' keyed by user or client address.
+
+    Rates are read from 'DEFAULT_THROTTLE_RATES' in DRF's '<number>/<period>'
+    format: the number is the burst size, refilled evenly over the period.
+    Checking a request is a single store lookup without database queries.
+    """
+
+    scope = None
+
+    def get_scope(self, view):
+        """
+        Return scope of the throttled view or None to skip throttling.
+        """
+        return self.scope
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+        self.wait_time = take_token(scope, getattr(request, 'user', None),
+                                    self.get_ident(request))
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class ScopedBucketThrottle(BucketRateThrottle):
+    """
+    Token bucket throttle of the view's 'throttle_scope'.
+    """
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None)
+
+
+class TokenObtainThrottle(BucketRateThrottle):
+    """
+    Token bucket throttle of JWT obtain endpoint keyed by client address.
+    """
+
+    scope = 'token'
+
+
+class TokenRefreshThrottle(BucketRateThrottle):
+    """
+    Token bucket throttle of JWT refresh endpoint keyed by client address.
+
+    Refreshes have their own bucket, so they do not use up login attempts.
+    """
+
+    scope = 'token_refresh'
+
+
+def throttled(scope, get_user):
+    """
+    Decorate an async view with the scope's token bucket throttle.
+
+    Buckets are shared with DRF views of the scope. 'get_user' is an async
+    callable returning the request's user or None.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            wait = take_token(scope, await get_user(request),
+                              BaseThrottle().get_ident(request))
+            if wait:
+                throttled = Throttled(wait)
+                response = HttpResponse(
+                    render_json({'detail': throttled.detail}),
+                    status=throttled.status_code,
+                    content_type='application/json',
+                )
+                response['Retry-After'] = str(ceil(wait))
+                return response
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -6,22 +6,43 @@ from rest_framework_simplejwt.views import (
 )
 
 
-from .views import PostViewSet, CommentViewSet, GroupViewSet, FollowViewSet
+from . import async_views
+from .throttling import TokenObtainThrottle, TokenRefreshThrottle
+from .views import (PostViewSet, CommentViewSet, GroupViewSet, FollowViewSet,
+                    FeedViewSet, UserViewSet, ExportView, MetricsView)
 
 
 router = DefaultRouter()
 
+router.register('feed', FeedViewSet, basename='feed')
 router.register('follow', FollowViewSet, basename='follow')
 router.register('group', GroupViewSet)
+router.register('users', UserViewSet, basename='users')
 router.register('posts', PostViewSet, basename='posts')
 router.register('posts/(?P<post_id>.+)/comments', CommentViewSet,
                 basename='comments')
 
 
 urlpatterns = [
-    path('v1/token/', TokenObtainPairView.as_view(),
+    path('v1/token/',
+         TokenObtainPairView.as_view(throttle_classes=[TokenObtainThrottle]),
          name='token_obtain_pair'),
-    path('v1/token/refresh/', TokenRefreshView.as_view(),
+    path('v1/token/refresh/',
+         TokenRefreshView.as_view(throttle_classes=[TokenRefreshThrottle]),
          name='token_refresh'),
+    path('v1/export/', ExportView.as_view(), name='export'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+    path('v1/async/posts/', async_views.post_list,
+         name='async-posts-list'),
+    path('v1/async/posts/<int:pk>/', async_views.post_detail,
+         name='async-posts-detail'),
+    path('v1/async/posts/<int:post_id>/comments/', async_views.comment_list,
+         name='async-comments-list'),
+    path('v1/async/posts/<int:post_id>/comments/<int:pk>/',
+         async_views.comment_detail, name='async-comments-detail'),
+    path('v1/async/group/', async_views.group_list,
+         name='async-group-list'),
+    path('v1/posts/<int:post_id>/comments/stream/',
+         async_views.comment_stream, name='comments-stream'),
     path('v1/', include(router.urls)),
 ]
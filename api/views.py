@@ -1,15 +1,50 @@
 """View classes of the 'api' app."""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .broker import get_broker
+from .caching import CachedResponseMixin, CachedRetrieveMixin
+from .counters import change_comments_count, change_follow_counts
+from .export import iter_export, parse_since
+from .feed import backfill_timeline, fan_out_posts, get_feed_rows
+from .group_posts import (add_posts, discard_groups, get_recent_posts,
+                          refresh_comments_count)
+from .hydration import get_latest_comments, parse_ids
+from .images import schedule_cleanup, schedule_variants
 from .models import Post, Group, Follow, User
+from .pagination import (IdKeysetPagination, KeysetPagination,
+                         RankedPagination)
 from .serializers import (PostSerializer,
                           CommentSerializer,
                           GroupSerializer,
                           FollowSerializer, )
 from .permissions import ResourcePermission, IsAuthenticated
+from .profiling import get_registry, section
+from .renderers import PrometheusRenderer
+from .rows import (COMMENT_VALUES, GROUP_VALUES, POST_VALUES, comment_row,
+                   group_row, post_row, user_row)
+from .search import FullTextSearchFilter
+
+
+def publish_comments(post_id, comments):
+    """
+    Publish serialized comments to the post's event stream.
+    """
+    broker = get_broker()
+    for comment in comments:
+        broker.publish(f'comments:{post_id}', dict(comment))
 
 
 class CreateAndListViewSet(mixins.CreateModelMixin,
@@ -18,6 +53,86 @@ class CreateAndListViewSet(mixins.CreateModelMixin,
     pass
 
 
+class BulkCreateMixin:
+    """
+    Accept JSON array of objects on create.
+
+    All items are validated first and saved with a single transaction,
+    the response lists created objects in request order.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Override get_serializer function.
+
+        Return list serializer for array payload of 'create' action.
+        """
+        if self.action == 'create' and isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+    @staticmethod
+    def get_created(serializer):
+        """
+        Return list of objects saved by serializer.
+        """
+        if isinstance(serializer.instance, list):
+            return serializer.instance
+        return [serializer.instance]
+
+
+class ValuesListMixin:
+    """
+    Render 'list' action from '.values()' rows instead of the serializer.
+
+    'list_row' builds the same representation as 'serializer_class' from
+    'list_values' fields, related names are joined in SQL. Turned off with
+    'API_FAST_LIST' setting.
+    """
+
+    list_values = None
+    list_row = None
+
+    def list(self, request, *args, **kwargs):
+        """
+        Override list function.
+
+        Return rows rendered without serializer fields.
+        """
+        if not getattr(settings, 'API_FAST_LIST', True):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.values(*self.list_values)
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+        with section('serializer'):
+            data = [self.list_row(row, request) for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class FullTextSearchMixin:
+    """
+    Search 'search_field' with 'search' query parameter.
+
+    Ranked results are paginated with 'RankedPagination' to keep rank order.
+    """
+
+    search_field = 'text'
+    search_pagination_class = RankedPagination
+
+    @property
+    def paginator(self):
+        """
+        Return paginator instance suitable for the request.
+        """
+        if (not hasattr(self, '_paginator')
+                and FullTextSearchFilter.get_query(self.request)):
+            self._paginator = self.search_pagination_class()
+        return super().paginator
+
+
 class FollowViewSet(CreateAndListViewSet):
     """
     Viewset for 'models.Follow' model.
@@ -25,11 +140,14 @@ class FollowViewSet(CreateAndListViewSet):
 
     serializer_class = FollowSerializer
     permission_classes = (ResourcePermission, IsAuthenticated)
+    throttle_scope = 'follow'
     filter_backends = (SearchFilter,)
     search_fields = ('=user__username',)
 
     def get_queryset(self):
-        return Follow.objects.filter(following=self.request.user)
+        return Follow.objects.filter(
+            following=self.request.user
+        ).select_related('user', 'following')
 
     def perform_create(self, serializer):
         """
@@ -39,61 +157,377 @@ class FollowViewSet(CreateAndListViewSet):
         """
         following_username = serializer.validated_data['following']
         following = get_object_or_404(User, username=following_username)
-        serializer.save(user=self.request.user, following=following)
+        with transaction.atomic():
+            serializer.save(user=self.request.user, following=following)
+            change_follow_counts(self.request.user.pk, following.pk, 1)
+        backfill_timeline(self.request.user, following)
+
+    @action(detail=False)
+    def check(self, request):
+        """
+        Return whether the current user follows each of 'username' users.
+
+        Usernames are passed as repeated or comma separated 'username'
+        parameters and checked with a single indexed query.
+        """
+        usernames = list(dict.fromkeys(
+            name for value in request.query_params.getlist('username')
+            for name in value.split(',') if name
+        ))
+        max_items = getattr(settings, 'FOLLOW_CHECK_MAX_ITEMS', 100)
+        if len(usernames) > max_items:
+            raise ValidationError({'username': [
+                f'Ensure this list has no more than {max_items} items.'
+            ]})
+        followed = set(Follow.objects.filter(
+            user=request.user, following__username__in=usernames
+        ).values_list('following__username', flat=True))
+        return Response({name: name in followed for name in usernames})
+
+
+class UserViewSet(viewsets.GenericViewSet):
+    """
+    Viewset for follow graph of users.
+
+    Profiles read denormalized 'models.FollowCounts', follow lists are
+    walked in user id order with 'IdKeysetPagination'.
+    """
+
+    queryset = User.objects.all()
+    lookup_field = 'username'
+    lookup_value_regex = '[^/]+'
+    permission_classes = (IsAuthenticated,)
+    pagination_class = IdKeysetPagination
+    throttle_scope = 'follow'
+
+    def retrieve(self, request, username=None):
+        """
+        Return username with follower and following counters.
+        """
+        profile = User.objects.filter(username=username).values(
+            'username',
+            followers_count=Coalesce('follow_counts__followers_count', 0),
+            following_count=Coalesce('follow_counts__following_count', 0),
+        ).first()
+        if profile is None:
+            raise Http404
+        return Response(profile)
+
+    @action(detail=True)
+    def followers(self, request, username=None):
+        """
+        Return users following the user.
+        """
+        follows = Follow.objects.filter(following_id=self.get_user_id())
+        return self.list_users(follows, 'user')
+
+    @action(detail=True)
+    def following(self, request, username=None):
+        """
+        Return users followed by the user.
+        """
+        follows = Follow.objects.filter(user_id=self.get_user_id())
+        return self.list_users(follows, 'following')
+
+    def get_user_id(self):
+        """
+        Return primary key of the user specified in URL or raise 404.
+        """
+        return get_object_or_404(
+            User.objects.values_list('pk', flat=True),
+            username=self.kwargs['username'],
+        )
+
+    def list_users(self, follows, field):
+        """
+        Return response with users of the 'field' side of follows.
+
+        Rows are ordered by the follow's own user id column, so they are read
+        from the follow index without sorting.
+        """
+        key = f'{field}_id'
+        queryset = follows.values(key, username=F(f'{field}__username'))
+        self.paginator.ordering_field = key
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset.order_by(key)) if page is None else page
+        data = [user_row(row) for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
 
 
-class GroupViewSet(CreateAndListViewSet):
+class GroupViewSet(CachedResponseMixin, ValuesListMixin,
+                   CreateAndListViewSet):
     """
     Viewset for 'models.Group' model.
     """
 
+    cache_resource = 'group'
+    list_values = GROUP_VALUES
+    list_row = staticmethod(group_row)
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = (ResourcePermission,)
+    throttle_scope = 'group'
+
+    @action(detail=True, pagination_class=KeysetPagination)
+    def posts(self, request, pk=None):
+        """
+        Return posts of the group, newest first.
+
+        Pages without cursor are cut from the cached newest posts of the
+        group when they fit, other pages are read from the database.
+        """
+        try:
+            group_id = int(pk)
+        except ValueError:
+            raise Http404
+        if not 0 < group_id < 2 ** 63:
+            raise Http404
+        paginator = self.paginator
+        page = rows = None
+        if paginator.cursor_query_param not in request.query_params:
+            entry = get_recent_posts(group_id)
+            if entry is None:
+                raise Http404
+            recent, complete = entry
+            if paginator.page_size_query_param in request.query_params:
+                page = paginator.paginate_rows(recent, request, not complete)
+            elif complete:
+                rows = recent
+        if page is None and rows is None:
+            queryset = Post.objects.filter(group_id=group_id).order_by(
+                '-pub_date', '-pk'
+            ).values(*POST_VALUES)
+            page = self.paginate_queryset(queryset)
+            if page is None:
+                rows = list(queryset)
+            if not (page or rows):
+                get_object_or_404(Group.objects.only('pk'), pk=group_id)
+        if page is not None:
+            rows = page
+        with section('serializer'):
+            data = [post_row(row, request) for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(BulkCreateMixin, FullTextSearchMixin, CachedRetrieveMixin,
+                  ValuesListMixin, viewsets.ModelViewSet):
     """
     Viewset for 'models.Post' model.
     """
 
-    queryset = Post.objects.all()
+    cache_resource = 'posts'
+    list_values = POST_VALUES
+    list_row = staticmethod(post_row)
+    conditional_field = 'pub_date'
+    queryset = Post.objects.select_related('author')
     serializer_class = PostSerializer
     permission_classes = (ResourcePermission,)
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = KeysetPagination
+    throttle_scope = 'posts'
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_fields = ('group',)
 
     def perform_create(self, serializer):
         """
         Override perform_create function.
 
-        Save 'author' field.
+        Save 'author' field, fan posts out to followers' timelines and add
+        them to cached newest posts of their groups.
         """
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            serializer.save(author=self.request.user)
+            posts = self.get_created(serializer)
+            fan_out_posts(self.request.user, posts)
+            for post in posts:
+                schedule_variants(post)
+            transaction.on_commit(lambda: add_posts(posts))
 
+    @action(detail=False)
+    def hydrate(self, request):
+        """
+        Return posts listed in 'ids' parameter in the requested order.
+
+        Posts are fetched with one 'in_bulk' query joining authors, unknown
+        ids are skipped. Optional 'comments' parameter embeds up to that
+        many newest comments of every post, fetched with one more query.
+        """
+        try:
+            ids = parse_ids(
+                request.query_params.getlist('ids'),
+                getattr(settings, 'POSTS_HYDRATE_MAX_ITEMS', 100),
+            )
+        except ValueError as error:
+            raise ValidationError({'ids': [str(error)]})
+        try:
+            comments = int(request.query_params.get('comments', 0))
+        except ValueError:
+            raise ValidationError({
+                'comments': ['A valid integer is required.']
+            })
+        comments = min(max(comments, 0),
+                       getattr(settings, 'POSTS_HYDRATE_MAX_COMMENTS', 20))
+        posts = self.get_queryset().in_bulk(ids)
+        posts = [posts[pk] for pk in ids if pk in posts]
+        data = self.get_serializer(posts, many=True).data
+        if comments:
+            by_post = get_latest_comments([post.pk for post in posts],
+                                          comments, request)
+            for item in data:
+                item['comments'] = by_post[item['id']]
+        return Response(data)
+
+    def perform_update(self, serializer):
+        """
+        Override perform_update function.
+
+        Render variants of a newly uploaded image, remove files of the
+        replaced one after commit and drop cached newest posts of the
+        post's groups.
+        """
+        instance = serializer.instance
+        group_id = instance.group_id
+        if 'image' not in serializer.validated_data:
+            serializer.save()
+        else:
+            image, variants = instance.image.name, instance.image_variants
+            with transaction.atomic():
+                serializer.save(image_variants={})
+                schedule_variants(instance)
+                if image != instance.image.name:
+                    schedule_cleanup(image, variants)
+        discard_groups(group_id, instance.group_id)
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        """
+        Override perform_destroy function.
+
+        Remove files of the post's image after commit and drop cached
+        newest posts of the post's group.
+        """
+        with transaction.atomic():
+            instance.delete()
+            schedule_cleanup(instance.image.name, instance.image_variants)
+        discard_groups(instance.group_id)
+
+
+class FeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Viewset for home timeline of the current user.
+    """
+
+    serializer_class = PostSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    throttle_scope = 'feed'
+
+    def list(self, request, *args, **kwargs):
+        """
+        Override list function.
+
+        Return timeline rows merged from the materialized timeline and
+        authors fanned out on read. 'API_FAST_LIST' turned off renders
+        them with the serializer.
+        """
+        paginator = self.paginator
+        params = request.query_params
+        paginate = (paginator.cursor_query_param in params
+                    or paginator.page_size_query_param in params)
+        position = limit = None
+        if paginate:
+            position = paginator.decode_cursor(request)
+            limit = paginator.get_page_size(request) + 1
+        rows = get_feed_rows(request.user, position, limit)
+        if paginate:
+            rows = paginator.paginate_rows(rows, request, False)
+        if getattr(settings, 'API_FAST_LIST', True):
+            with section('serializer'):
+                data = [post_row(row, request) for row in rows]
+        else:
+            posts = Post.objects.select_related('author').in_bulk(
+                [row['id'] for row in rows]
+            )
+            data = self.get_serializer(
+                [posts[row['id']] for row in rows], many=True
+            ).data
+        if paginate:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class CommentViewSet(BulkCreateMixin, FullTextSearchMixin,
+                     CachedResponseMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """
     Viewset for 'models.Comment' model.
     """
 
+    list_values = COMMENT_VALUES
+    list_row = staticmethod(comment_row)
+
     serializer_class = CommentSerializer
     permission_classes = (ResourcePermission, IsAuthenticated)
+    throttle_scope = 'comments'
+    filter_backends = (FullTextSearchFilter,)
+    conditional_field = 'created'
+
+    def get_cache_resources(self):
+        """
+        Override get_cache_resources.
+
+        Return comments of the post and posts, which embed comment counters.
+        """
+        return [f'comments:{self.kwargs.get("post_id")}', 'posts']
 
     def get_post(self):
         """
         Return 'models.Post' specified in URL by id.
+
+        The post is fetched once per request.
         """
-        return get_object_or_404(Post, pk=self.kwargs.get('post_id'))
+        if not hasattr(self, '_post'):
+            self._post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
+        return self._post
 
     def perform_create(self, serializer):
         """
         Override perform_create function.
 
-        Save 'author' and 'post' fields.
+        Save 'author' and 'post' fields, increment post's counter and
+        refresh it in cached newest posts of its group after commit.
         """
-        serializer.save(author=self.request.user,
-                        post=self.get_post())
+        post = self.get_post()
+        with transaction.atomic():
+            serializer.save(author=self.request.user, post=post)
+            change_comments_count(post.pk,
+                                  len(self.get_created(serializer)))
+            transaction.on_commit(
+                lambda: refresh_comments_count(post.group_id, post.pk)
+            )
+            events = serializer.data
+            if not isinstance(events, list):
+                events = [events]
+            transaction.on_commit(
+                lambda: publish_comments(post.pk, events)
+            )
+
+    def perform_destroy(self, instance):
+        """
+        Override perform_destroy function.
+
+        Delete comment, decrement post's counter and refresh it in cached
+        newest posts of its group after commit.
+        """
+        post = self.get_post()
+        with transaction.atomic():
+            instance.delete()
+            change_comments_count(post.pk, -1)
+            transaction.on_commit(
+                lambda: refresh_comments_count(post.group_id, post.pk)
+            )
 
     def get_queryset(self):
         """
@@ -101,4 +535,44 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         Return 'models.Comment' queryset for post_id in URL.
         """
-        return self.get_post().comments.all()
+        return self.get_post().comments.select_related('author')
+
+
+class ExportView(APIView):
+    """
+    Stream all posts with comments as NDJSON.
+
+    Accepts optional 'since' pub_date watermark for incremental exports.
+    """
+
+    permission_classes = (IsAdminUser,)
+    throttle_scope = 'export'
+    chunk_size = 1000
+
+    def get(self, request):
+        """
+        Return streaming NDJSON response.
+        """
+        try:
+            since = parse_since(request.query_params.get('since'))
+        except ValueError as error:
+            raise ValidationError({'since': [str(error)]})
+        return StreamingHttpResponse(
+            iter_export(since, self.chunk_size),
+            content_type='application/x-ndjson',
+        )
+
+
+class MetricsView(APIView):
+    """
+    Expose request profiling histograms in Prometheus text format.
+    """
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        """
+        Return metrics of the last 'API_PROFILING_WINDOW' seconds.
+        """
+        return Response(get_registry().render())
@@ -0,0 +1,88 @@
+"""Compare WSGI (DRF) and ASGI (async-native) read paths.
+
+Usage: python -m benchmarks.async_read [--requests N] [--concurrency C]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (access_token, dump, seed, setup_django,
+                               summarize)
+
+
+def run_wsgi(url, headers, requests, concurrency):
+    """
+    Drive WSGI handler from a thread pool.
+    """
+    from django.test import Client
+
+    def call(_):
+        client = Client()
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(call, range(requests)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_asgi(url, headers, requests, concurrency):
+    """
+    Drive ASGI handler from concurrent coroutines.
+    """
+    from django.test import AsyncClient
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def call():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                assert response.status_code == 200, response.status_code
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(call() for _ in range(requests)))
+        return summarize(latencies, time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--posts', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    users = seed(posts=args.posts)
+    from api.models import Post
+
+    post_id = Post.objects.values_list('pk', flat=True).first()
+    headers = {'Authorization': f'Bearer {access_token(users[0])}'}
+    routes = {
+        'posts-list': 'posts/?limit=50',
+        'posts-detail': f'posts/{post_id}/',
+        'comments-list': f'posts/{post_id}/comments/',
+        'group-list': 'group/',
+    }
+    report = {}
+    for name, route in routes.items():
+        report[name] = {
+            'wsgi': run_wsgi(f'/api/v1/{route}', headers,
+                             args.requests, args.concurrency),
+            'asgi': run_asgi(f'/api/v1/async/{route}', headers,
+                             args.requests, args.concurrency),
+        }
+    dump(report)
+
+
+if __name__ == '__main__':
+    main()
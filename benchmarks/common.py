@@ -0,0 +1,123 @@
+"""Shared helpers of the performance benchmarks."""
+import json
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(db_name=None, **overrides):
+    """
+    Configure Django against a scratch SQLite database and migrate it.
+
+    Response caching and throttling are disabled unless overridden, so
+    every request reaches the database. Return path of the database file.
+    """
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+    from django.conf import settings
+
+    if db_name is None:
+        db_name = os.path.join(tempfile.mkdtemp(prefix='yatube-bench-'),
+                               'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_name
+    settings.CACHES['dummy'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    settings.API_CACHE_ALIAS = 'dummy'
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_CLASSES': [],
+        'DEFAULT_THROTTLE_RATES': {
+            scope: '1000000/s' for scope in
+            settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+        },
+    }
+    settings.DEBUG = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import django
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+    return db_name
+
+
+def seed(users=20, posts=2000, comments_per_post=5, groups=10,
+         follows_per_user=0):
+    """
+    Bulk insert a synthetic dataset and return list of created users.
+    """
+    from benchmarks.factories import (make_comments, make_follows,
+                                      make_groups, make_posts, make_users)
+
+    authors = make_users(users)
+    post_ids = make_posts(authors, make_groups(groups), posts)
+    make_comments(authors, post_ids, comments_per_post)
+    if follows_per_user:
+        make_follows(authors, follows_per_user)
+    return authors
+
+
+def access_token(user):
+    """
+    Return JWT access token of the user.
+    """
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def refresh_token(user):
+    """
+    Return JWT refresh token of the user.
+    """
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return str(RefreshToken.for_user(user))
+
+
+def percentile(values, q):
+    """
+    Return q-th percentile of values using nearest-rank method.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(latencies, wall_time):
+    """
+    Return throughput and latency percentiles in milliseconds.
+    """
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / wall_time, 1) if wall_time else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def timed(func, *args, **kwargs):
+    """
+    Return '(elapsed seconds, result)' of the call.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def dump(report):
+    """
+    Print report as indented JSON.
+    """
+    print(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,282 @@
+"""Drive every route of 'api/urls.py' and report latency and SQL counts.
+
+Seeds a dataset with the bulk factories, then sends '--requests' requests
+per route from '--concurrency' threads through the Django test client.
+The comment event stream never ends and is left out.
+
+Baselines: '--save FILE' stores the routes report, '--compare FILE' adds
+per-route changes against a saved report and exits with status 1 if p95
+latency or throughput got worse than '--threshold' or median SQL count
+grew.
+
+Usage: python -m benchmarks.endpoints [--requests N] [--concurrency C]
+       [--routes posts-list ...] [--save FILE] [--compare FILE]
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from threading import Lock
+from urllib.parse import quote
+
+from benchmarks.common import (access_token, dump, percentile,
+                               refresh_token, seed, setup_django, summarize)
+from benchmarks.factories import make_comments, make_posts, make_users
+
+
+class Route:
+    """
+    Request template of one route.
+
+    'path' and 'data' are called with a sequence number of the request,
+    so unsafe routes can target a different object every time.
+    """
+
+    def __init__(self, name, method, path, data=None, token=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.token = token
+
+
+def build_routes(owner, admin, requests):
+    """
+    Return routes of 'api/urls.py' bound to the seeded dataset.
+
+    Routes are sent as 'owner' unless they need 'admin'.
+    """
+    from api.models import Comment, Post
+
+    admin_token = access_token(admin)
+    post_id, comment_id = Comment.objects.filter(
+        post__author=owner, author=owner
+    ).order_by('pk').values_list('post_id', 'pk').first()
+    # Objects consumed one per request by update and delete routes.
+    own_posts = make_posts([owner], [], requests * 2)
+    make_comments([owner], own_posts[:requests], 1)
+    own_comments = list(Comment.objects.filter(
+        post_id__in=own_posts[:requests]
+    ).order_by('pk').values_list('post_id', 'pk'))
+    targets = make_users(requests, prefix='bench_target')
+    refresh = {'refresh': refresh_token(owner)}
+    search = quote('запись')
+    group_id = Post.objects.filter(group__isnull=False).values_list(
+        'group', flat=True).first()
+    hydrate_ids = ','.join(map(str, Post.objects.values_list(
+        'pk', flat=True)[:50]))
+    usernames = ','.join(target.username for target in targets[:20])
+
+    def post(i):
+        return own_posts[i]
+
+    return [
+        Route('token_obtain_pair', 'post', lambda i: '/api/v1/token/',
+              lambda i: {'username': owner.username,
+                         'password': 'bench-password'}),
+        Route('token_refresh', 'post', lambda i: '/api/v1/token/refresh/',
+              lambda i: refresh),
+        Route('export', 'get', lambda i: '/api/v1/export/?since='
+              '2100-01-01T00:00:00Z', token=admin_token),
+        Route('metrics', 'get', lambda i: '/api/v1/metrics/',
+              token=admin_token),
+        Route('feed-list', 'get', lambda i: '/api/v1/feed/?limit=20'),
+        Route('follow-list', 'get', lambda i: '/api/v1/follow/'),
+        Route('follow-create', 'post', lambda i: '/api/v1/follow/',
+              lambda i: {'following': targets[i].username}),
+        Route('follow-check', 'get',
+              lambda i: f'/api/v1/follow/check/?username={usernames}'),
+        Route('users-detail', 'get',
+              lambda i: f'/api/v1/users/{owner.username}/'),
+        Route('users-followers', 'get',
+              lambda i: f'/api/v1/users/{owner.username}/followers/?limit=20'),
+        Route('users-following', 'get',
+              lambda i: f'/api/v1/users/{owner.username}/following/?limit=20'),
+        Route('group-list', 'get', lambda i: '/api/v1/group/'),
+        Route('group-posts', 'get',
+              lambda i: f'/api/v1/group/{group_id}/posts/?limit=20'),
+        Route('group-create', 'post', lambda i: '/api/v1/group/',
+              lambda i: {'title': f'Новая группа {i}',
+                         'slug': f'bench-group-{i}'}),
+        Route('posts-list', 'get', lambda i: '/api/v1/posts/?limit=20'),
+        Route('posts-search', 'get',
+              lambda i: f'/api/v1/posts/?search={search}&limit=20'),
+        Route('posts-hydrate', 'get',
+              lambda i: f'/api/v1/posts/hydrate/?ids={hydrate_ids}'
+                        f'&comments=3'),
+        Route('posts-create', 'post', lambda i: '/api/v1/posts/',
+              lambda i: {'text': f'Новая запись {i}'}),
+        Route('posts-detail', 'get', lambda i: f'/api/v1/posts/{post_id}/'),
+        Route('posts-update', 'patch',
+              lambda i: f'/api/v1/posts/{post(requests + i)}/',
+              lambda i: {'text': f'Изменённая запись {i}'}),
+        Route('posts-delete', 'delete',
+              lambda i: f'/api/v1/posts/{post(requests + i)}/'),
+        Route('comments-list', 'get',
+              lambda i: f'/api/v1/posts/{post_id}/comments/'),
+        Route('comments-create', 'post',
+              lambda i: f'/api/v1/posts/{post_id}/comments/',
+              lambda i: {'text': f'Новый комментарий {i}'}),
+        Route('comments-detail', 'get',
+              lambda i: f'/api/v1/posts/{post_id}/comments/{comment_id}/'),
+        Route('comments-update', 'patch',
+              lambda i: '/api/v1/posts/{}/comments/{}/'.format(
+                  *own_comments[i]),
+              lambda i: {'text': f'Изменённый комментарий {i}'}),
+        Route('comments-delete', 'delete',
+              lambda i: '/api/v1/posts/{}/comments/{}/'.format(
+                  *own_comments[i])),
+        Route('async-posts-list', 'get',
+              lambda i: '/api/v1/async/posts/?limit=20'),
+        Route('async-posts-detail', 'get',
+              lambda i: f'/api/v1/async/posts/{post_id}/'),
+        Route('async-comments-list', 'get',
+              lambda i: f'/api/v1/async/posts/{post_id}/comments/'),
+        Route('async-comments-detail', 'get',
+              lambda i: f'/api/v1/async/posts/{post_id}/comments/'
+                        f'{comment_id}/'),
+        Route('async-group-list', 'get', lambda i: '/api/v1/async/group/'),
+    ]
+
+
+def run_route(route, token, requests, concurrency):
+    """
+    Send 'requests' requests of the route and summarize them.
+    """
+    from django.db import connections
+    from django.test import Client
+
+    from api.profiling import RequestProfile, current_profile, record_query
+
+    counter = itertools.count()
+    lock = Lock()
+    latencies, queries, errors = [], [], []
+
+    def worker():
+        client = Client()
+        headers = {'Authorization': f'Bearer {route.token or token}'}
+        with ExitStack() as stack:
+            for connection in connections.all():
+                # Connection setup queries are not counted.
+                connection.ensure_connection()
+                stack.enter_context(connection.execute_wrapper(record_query))
+            while True:
+                with lock:
+                    i = next(counter)
+                if i >= requests:
+                    break
+                kwargs = {'headers': headers}
+                if route.data is not None:
+                    kwargs['data'] = json.dumps(route.data(i))
+                    kwargs['content_type'] = 'application/json'
+                profile = RequestProfile()
+                context = current_profile.set(profile)
+                start = time.perf_counter()
+                try:
+                    response = getattr(client, route.method)(
+                        route.path(i), **kwargs
+                    )
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    current_profile.reset(context)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+                    continue
+                latencies.append(elapsed)
+                queries.append(profile.sql_queries)
+        connections.close_all()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall_time = time.perf_counter() - start
+    if not latencies:
+        return {'requests': 0, 'errors': len(errors),
+                'error_statuses': sorted(set(errors))}
+    return {
+        **summarize(latencies, wall_time),
+        'sql_queries_p50': percentile(queries, 50),
+        'sql_queries_mean': round(sum(queries) / len(queries), 2),
+        'sql_queries_max': max(queries),
+        'errors': len(errors),
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    Return per-route changes against baseline and whether any regressed.
+    """
+    changes, regressed = {}, False
+    for name, current in report.items():
+        base = baseline.get(name)
+        if not base or not current.get('requests') or not base.get('requests'):
+            continue
+        p95 = current['p95_ms'] / base['p95_ms'] - 1
+        rps = current['rps'] / base['rps'] - 1
+        # Median ignores cold caches of the first requests of a thread.
+        sql = current['sql_queries_p50'] - base['sql_queries_p50']
+        regression = p95 > threshold or rps < -threshold or sql > 0
+        regressed = regressed or regression
+        changes[name] = {
+            'p95_change': round(p95, 3),
+            'rps_change': round(rps, 3),
+            'sql_queries_change': sql,
+            'regression': regression,
+        }
+    return changes, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--comments', type=int, default=5)
+    parser.add_argument('--follows', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--routes', nargs='+')
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup_django()
+    users = seed(users=args.users, posts=args.posts,
+                 comments_per_post=args.comments, groups=args.groups,
+                 follows_per_user=args.follows)
+    owner, admin = users[0], users[-1]
+    admin.is_staff = True
+    admin.save(update_fields=['is_staff'])
+    routes = build_routes(owner, admin, args.requests)
+    token = access_token(owner)
+
+    report = {}
+    for route in routes:
+        if args.routes and route.name not in args.routes:
+            continue
+        report[route.name] = run_route(route, token, args.requests,
+                                       args.concurrency)
+    result = {'routes': report}
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    regressed = False
+    if args.compare:
+        with open(args.compare) as file:
+            result['comparison'], regressed = compare(
+                report, json.load(file), args.threshold
+            )
+    dump(result)
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
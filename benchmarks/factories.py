@@ -0,0 +1,97 @@
+"""Bulk factories of the benchmark datasets.
+
+Rows are generated by the builders of 'api.seeding', the ones behind the
+'seed_yatube' command, and inserted in chunks, so datasets of any size are
+built without per-row queries or signals. Every factory returns what the
+next factory needs.
+"""
+BATCH_SIZE = 1000
+
+# Seed of the random generators of the benchmark rows.
+SEED = 'bench'
+
+
+def create(table, count, **options):
+    """
+    Generate and insert 'count' items of a seeding table.
+
+    Return primary key offsets the new rows were generated above.
+    """
+    from django.db import transaction
+
+    from api.seeding import TABLES, get_offsets, get_random, insert_rows
+
+    model, build, _ = TABLES[table]
+    offsets = get_offsets()
+    rows = build(get_random(SEED, table, 0), 0, count, offsets, options)
+    with transaction.atomic():
+        insert_rows(model, rows, BATCH_SIZE)
+    return offsets
+
+
+def make_users(count, prefix='bench_user', password='bench-password'):
+    """
+    Create users sharing one pre-hashed password, return them by pk.
+    """
+    from django.contrib.auth.hashers import make_password
+
+    from api.models import User
+
+    offsets = create('users', count, password_hash=make_password(password),
+                     username_prefix=f'{prefix}_')
+    return list(User.objects.filter(pk__gt=offsets['auth.user'])
+                .order_by('pk'))
+
+
+def make_groups(count):
+    """
+    Create groups, return their ids.
+    """
+    from api.models import Group
+
+    offsets = create('groups', count)
+    return list(Group.objects.filter(pk__gt=offsets['api.group'])
+                .order_by('pk').values_list('pk', flat=True))
+
+
+def make_posts(authors, group_ids, count):
+    """
+    Create posts of random authors and groups, return ids of new posts.
+    """
+    from api.models import Post
+
+    offsets = create('posts', count, group_ids=group_ids,
+                     user_ids=[author.pk for author in authors])
+    return list(Post.objects.filter(pk__gt=offsets['api.post'])
+                .order_by('pk').values_list('pk', flat=True))
+
+
+def make_comments(authors, post_ids, per_post):
+    """
+    Create 'per_post' comments per post on average and keep
+    'comments_count' in sync.
+    """
+    from api.models import Post
+    from api.seeding import count_comments
+
+    create('comments', len(post_ids) * per_post, post_ids=post_ids,
+           user_ids=[author.pk for author in authors])
+    for start in range(0, len(post_ids), BATCH_SIZE):
+        count_comments(Post.objects.filter(
+            pk__in=post_ids[start:start + BATCH_SIZE]
+        ))
+
+
+def make_follows(users, per_user):
+    """
+    Make every user follow 'per_user' random users on average, count
+    follows and build timelines.
+    """
+    from api.counters import reconcile_follow_counts
+    from api.feed import rebuild_timeline
+
+    create('follows', len(users), follows=per_user,
+           user_ids=[user.pk for user in users])
+    reconcile_follow_counts()
+    for user in users:
+        rebuild_timeline(user)
@@ -0,0 +1,79 @@
+"""Compare serializer and '.values()' rendering of post and comment lists.
+
+Also compares JSON encoding of the rendered post rows with DRF's stdlib
+'JSONRenderer' and orjson-based 'FastJSONRenderer'.
+
+Usage: python -m benchmarks.serialization [--sizes 1000 10000] [--repeat N]
+"""
+import argparse
+
+from benchmarks.common import dump, seed, setup_django, timed
+
+
+def best_of(repeat, func):
+    """
+    Return the fastest of repeated calls in milliseconds.
+    """
+    return round(min(timed(func)[0] for _ in range(repeat)) * 1000, 3)
+
+
+def measure(size, repeat, request):
+    """
+    Return rendering times of 'size' posts and comments.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from api.models import Comment, Post
+    from api.renderers import FastJSONRenderer
+    from api.rows import COMMENT_VALUES, POST_VALUES, comment_row, post_row
+    from api.serializers import CommentSerializer, PostSerializer
+
+    posts = Post.objects.order_by('-pub_date')[:size]
+    comments = Comment.objects.order_by('-created')[:size]
+    context = {'request': request}
+    rows = [post_row(row, request) for row in posts.values(*POST_VALUES)]
+    return {
+        'posts': {
+            'serializer_ms': best_of(repeat, lambda: PostSerializer(
+                posts.select_related('author'), many=True, context=context
+            ).data),
+            'values_ms': best_of(repeat, lambda: [
+                post_row(row, request) for row in posts.values(*POST_VALUES)
+            ]),
+            'json_ms': best_of(repeat, lambda: JSONRenderer().render(rows)),
+            'fast_json_ms': best_of(
+                repeat, lambda: FastJSONRenderer().render(rows)
+            ),
+        },
+        'comments': {
+            'serializer_ms': best_of(repeat, lambda: CommentSerializer(
+                comments.select_related('author'), many=True, context=context
+            ).data),
+            'values_ms': best_of(repeat, lambda: [
+                comment_row(row, request)
+                for row in comments.values(*COMMENT_VALUES)
+            ]),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(posts=max(args.sizes), comments_per_post=1)
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get('/api/v1/posts/'))
+    dump({
+        str(size): measure(size, args.repeat, request)
+        for size in args.sizes
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Stress SQLite with concurrent comment writes and post list reads.
+
+Runs the same mixed workload against a fresh database for every profile:
+'default' is plain SQLite without persistent connections, 'tuned' applies
+'SQLITE_PROFILES["tuned"]' PRAGMAs with 'CONN_MAX_AGE' connections.
+
+Usage: python -m benchmarks.sqlite_stress [--writers W] [--readers R]
+       [--duration S] [--profiles default tuned]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.common import (access_token, dump, seed, setup_django,
+                               summarize)
+
+PROFILES = {
+    'default': {'SQLITE_PROFILE': 'default', 'CONN_MAX_AGE': 0},
+    'tuned': {'SQLITE_PROFILE': 'tuned', 'CONN_MAX_AGE': 60},
+}
+
+
+def use_profile(name):
+    """
+    Point the default database at a fresh file tuned by the profile.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    connections.close_all()
+    profile = PROFILES[name]
+    settings.SQLITE_PROFILE = profile['SQLITE_PROFILE']
+    database = settings.DATABASES['default']
+    database['CONN_MAX_AGE'] = profile['CONN_MAX_AGE']
+    database['NAME'] = os.path.join(
+        tempfile.mkdtemp(prefix='yatube-stress-'), f'{name}.sqlite3'
+    )
+    call_command('migrate', verbosity=0)
+
+
+def worker(stop, request, results):
+    """
+    Repeat the request until stopped, recording latencies and failures.
+    """
+    from django.db import OperationalError, connection
+    from django.test import Client
+
+    client = Client()
+    latencies, errors = [], 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = request(client)
+        except OperationalError:
+            errors += 1
+            continue
+        if response.status_code >= 400:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    results.append((latencies, errors))
+
+
+def run(writers, readers, duration, post_ids, tokens):
+    """
+    Run writer and reader threads for 'duration' seconds.
+    """
+    stop = threading.Event()
+    writes, reads = [], []
+
+    def write(client):
+        return client.post(
+            f'/api/v1/posts/{random.choice(post_ids)}/comments/',
+            {'text': 'Нагрузочный комментарий'},
+            headers={'Authorization': f'Bearer {random.choice(tokens)}'},
+            content_type='application/json',
+        )
+
+    def read(client):
+        return client.get(
+            '/api/v1/posts/?limit=20',
+            headers={'Authorization': f'Bearer {random.choice(tokens)}'},
+        )
+
+    threads = [
+        threading.Thread(target=worker, args=(stop, write, writes))
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=worker, args=(stop, read, reads))
+        for _ in range(readers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - start
+
+    def report(results):
+        latencies = [value for values, _ in results for value in values]
+        return {
+            **summarize(latencies, wall_time),
+            'errors': sum(errors for _, errors in results),
+        }
+
+    return {'writes': report(writes), 'reads': report(reads)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES,
+                        default=list(PROFILES))
+    args = parser.parse_args()
+
+    setup_django()
+    from api.models import Post
+
+    report = {}
+    for name in args.profiles:
+        use_profile(name)
+        users = seed(users=10, posts=500, comments_per_post=2)
+        tokens = [access_token(user) for user in users]
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        report[name] = run(args.writers, args.readers, args.duration,
+                           post_ids, tokens)
+    dump(report)
+
+
+if __name__ == '__main__':
+    main()
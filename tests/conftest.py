@@ -1,4 +1,36 @@
+import pytest
+
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def file_cache_location(tmp_path_factory):
+    # Keep the server's file cache out of reach of the tests.
+    from django.conf import settings
+    from django.test import override_settings
+
+    caches = {**settings.CACHES, 'files': {
+        **settings.CACHES['files'],
+        'LOCATION': str(tmp_path_factory.mktemp('cache')),
+    }}
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.authentication import user_cache
+    from api.caching import get_cache
+    from api.group_posts import recent_posts
+    from api.throttling import get_store
+    cache.clear()
+    get_cache().clear()
+    user_cache.clear()
+    recent_posts.clear()
+    get_store().clear()
@@ -0,0 +1,67 @@
+import pytest
+
+from api.models import Post
+
+
+class TestAsyncReadViews:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_posts_match_sync(self, client, post, another_post, group_1):
+        for url in ('posts/', f'posts/?group={group_1.id}', f'posts/{post.id}/', 'group/'):
+            response = client.get(f'/api/v1/async/{url}')
+            assert response.status_code == 200, \
+                f'Проверьте, что `/api/v1/async/{url}` возвращает статус 200'
+            assert response.content == client.get(f'/api/v1/{url}').content, \
+                f'Проверьте, что `/api/v1/async/{url}` возвращает те же данные, что и `/api/v1/{url}`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_posts_invalid_group(self, client, post):
+        for group in ('abc', '²', '99999999999999999999999', '100500'):
+            response = client.get(f'/api/v1/async/posts/?group={group}')
+            assert response.status_code == 400, \
+                'Проверьте, что некорректная группа возвращает статус 400, как синхронный эндпоинт'
+            assert response.json() == client.get(f'/api/v1/posts/?group={group}').json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_posts_cursor(self, client, user):
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=user)
+
+        first = client.get('/api/v1/async/posts/?limit=2').json()
+        expected = client.get('/api/v1/posts/?limit=2').json()
+        assert first['results'] == expected['results']
+        assert sorted(first['next'].split('?')[1].split('&')) == sorted(expected['next'].split('?')[1].split('&'))
+        second = client.get(first['next']).json()
+        assert [item['text'] for item in first['results'] + second['results']] == ['Пост 2', 'Пост 1', 'Пост 0']
+        assert second['next'] is None
+        assert client.get('/api/v1/async/posts/?cursor=broken').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_comments(self, client, user_client, post, comment_1_post, comment_2_post):
+        url = f'posts/{post.id}/comments/'
+        assert client.get(f'/api/v1/async/{url}').status_code == 401, \
+            'Проверьте, что комментарии без токена недоступны'
+
+        response = user_client.get(f'/api/v1/async/{url}')
+        assert response.status_code == 200
+        assert response.content == user_client.get(f'/api/v1/{url}').content
+
+        response = user_client.get(f'/api/v1/async/{url}{comment_1_post.id}/')
+        assert response.content == user_client.get(f'/api/v1/{url}{comment_1_post.id}/').content
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_invalid_token(self, client, user, post):
+        for header in ('Bearer broken', 'Bearer two parts'):
+            for url in ('posts/', f'posts/{post.id}/', 'group/', f'posts/{post.id}/comments/'):
+                response = client.get(f'/api/v1/async/{url}', HTTP_AUTHORIZATION=header)
+                expected = client.get(f'/api/v1/{url}', HTTP_AUTHORIZATION=header)
+                assert response.status_code == expected.status_code == 401, \
+                    'Проверьте, что недействительный токен возвращает статус 401, как синхронный эндпоинт'
+                assert response.json() == expected.json()
+                assert response['WWW-Authenticate'] == expected['WWW-Authenticate']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_not_found(self, client, user_client):
+        assert client.get('/api/v1/async/posts/100500/').status_code == 404
+        assert user_client.get('/api/v1/async/posts/100500/comments/').status_code == 404
+        assert client.post('/api/v1/async/posts/').status_code == 405
@@ -0,0 +1,33 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class TestCachedAuthentication:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_user_lookup_cached(self, user_client, post):
+        user_client.get('/api/v1/posts/')
+        with CaptureQueriesContext(connection) as context:
+            user_client.get('/api/v1/posts/')
+
+        assert not any('auth_user' in query['sql'] and 'api_post' not in query['sql']
+                       for query in context.captured_queries), \
+            'Проверьте, что пользователь из токена берётся из кэша'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deactivated_user_rejected(self, user_client, user):
+        assert user_client.get('/api/v1/follow/').status_code == 200
+        user.is_active = False
+        user.save()
+
+        assert user_client.get('/api/v1/follow/').status_code == 401, \
+            'Проверьте, что деактивированный пользователь сразу теряет доступ'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deleted_user_rejected(self, user_client, user):
+        assert user_client.get('/api/v1/follow/').status_code == 200
+        user.delete()
+
+        assert user_client.get('/api/v1/follow/').status_code == 401, \
+            'Проверьте, что удалённый пользователь сразу теряет доступ'
@@ -0,0 +1,56 @@
+import pytest
+
+from api.models import Comment, Post, TimelineEntry
+
+
+class TestBulkCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create(self, user_client, user, follow_2, user_2):
+        data = [{'text': f'Пакетный пост {i}'} for i in range(3)]
+        response = user_client.post('/api/v1/posts/', data=data, format='json')
+
+        assert response.status_code == 201, \
+            'Проверьте, что POST массива на `/api/v1/posts/` возвращает статус 201'
+        test_data = response.json()
+        assert [item['text'] for item in test_data] == [item['text'] for item in data], \
+            'Проверьте, что в ответе возвращаются созданные записи в порядке запроса'
+        assert all(item['author'] == user.username and item['id'] for item in test_data)
+        assert Post.objects.count() == 3
+        assert TimelineEntry.objects.filter(user=user_2).count() == 3, \
+            'Проверьте, что пакетно созданные записи попадают в ленты подписчиков'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create_invalid(self, user_client):
+        data = [{'text': 'Пост'}, {}]
+        response = user_client.post('/api/v1/posts/', data=data, format='json')
+
+        assert response.status_code == 400, \
+            'Проверьте, что при ошибке в одном из элементов массива возвращается статус 400'
+        errors = response.json()
+        if isinstance(errors, list):
+            errors = {str(index): error for index, error in enumerate(errors) if error}
+        assert list(errors) == ['1'] and 'text' in errors['1'], \
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        assert not Post.objects.exists(), 'Проверьте, что при ошибке ничего не сохраняется'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_bulk_create_limit(self, settings, user_client):
+        settings.BULK_CREATE_MAX_ITEMS = 2
+        data = [{'text': f'Пост {i}'} for i in range(3)]
+        response = user_client.post('/api/v1/posts/', data=data, format='json')
+
+        assert response.status_code == 400
+        assert not Post.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_bulk_create(self, user_client, post):
+        data = [{'text': 'Коммент 1'}, {'text': 'Коммент 2'}]
+        response = user_client.post(f'/api/v1/posts/{post.id}/comments/', data=data, format='json')
+
+        assert response.status_code == 201
+        assert [item['post'] for item in response.json()] == [post.id, post.id]
+        assert Comment.objects.filter(post=post).count() == 2
+        post.refresh_from_db()
+        assert post.comments_count == 2, \
+            'Проверьте, что пакетное создание комментариев обновляет `comments_count`'
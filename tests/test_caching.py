@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class TestResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_list_cached(self, client, post, another_post):
+        first = client.get('/api/v1/posts/').json()
+        with CaptureQueriesContext(connection) as context:
+            second = client.get('/api/v1/posts/').json()
+
+        assert second == first
+        assert len(context.captured_queries) == 1, \
+            'Проверьте, что повторный GET `/api/v1/posts/` обслуживается из кэша'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_update_invalidates(self, user_client, post):
+        user_client.get(f'/api/v1/posts/{post.id}/')
+        user_client.get('/api/v1/posts/')
+        user_client.patch(f'/api/v1/posts/{post.id}/', data={'text': 'Новый текст'})
+
+        assert user_client.get(f'/api/v1/posts/{post.id}/').json()['text'] == 'Новый текст', \
+            'Проверьте, что изменение записи сбрасывает кэш `/api/v1/posts/{id}/`'
+        assert user_client.get('/api/v1/posts/').json()[0]['text'] == 'Новый текст', \
+            'Проверьте, что изменение записи сбрасывает кэш `/api/v1/posts/`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comment_create_invalidates(self, user_client, post):
+        assert user_client.get(f'/api/v1/posts/{post.id}/comments/').json() == []
+        assert user_client.get(f'/api/v1/posts/{post.id}/').json()['comments_count'] == 0
+        user_client.post(f'/api/v1/posts/{post.id}/comments/', data={'text': 'Коммент'})
+
+        assert len(user_client.get(f'/api/v1/posts/{post.id}/comments/').json()) == 1, \
+            'Проверьте, что создание комментария сбрасывает кэш списка комментариев'
+        assert user_client.get(f'/api/v1/posts/{post.id}/').json()['comments_count'] == 1, \
+            'Проверьте, что создание комментария сбрасывает кэш записи'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_file_cache(self, settings, tmp_path, user_client, group_1):
+        settings.CACHES = {
+            **settings.CACHES,
+            'files': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            },
+        }
+        settings.API_CACHE_ALIAS = 'files'
+        assert len(user_client.get('/api/v1/group/').json()) == 1
+        assert any(tmp_path.iterdir()), 'Проверьте, что файловый кэш сохраняет ответы'
+
+        user_client.post('/api/v1/group/', data={'title': 'Группа 3'})
+        assert len(user_client.get('/api/v1/group/').json()) == 2, \
+            'Проверьте, что создание группы сбрасывает кэш `/api/v1/group/`'
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+
+from api.broker import OVERFLOW, InProcessBroker
+
+
+def parse_event(chunk):
+    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+    return int(fields['id']), json.loads(fields['data'])
+
+
+class TestCommentStream:
+
+    def test_broker_publish_from_thread(self):
+        async def main():
+            broker = InProcessBroker(maxsize=2)
+            subscription = broker.subscribe('channel')
+            thread = threading.Thread(target=broker.publish, args=('channel', {'id': 1}))
+            thread.start()
+            thread.join()
+            assert await asyncio.wait_for(subscription.get(), 1) == {'id': 1}
+
+            for i in range(3):
+                broker.publish('channel', {'id': i})
+            await asyncio.sleep(0)
+            assert await subscription.get() is OVERFLOW, \
+                'Проверьте, что переполненная подписка получает маркер OVERFLOW'
+
+            subscription.close()
+            assert not broker._channels
+
+        asyncio.run(main())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comment_stream_resume_and_live(self, token, post, comment_1_post, comment_2_post, user_client):
+        url = f'/api/v1/posts/{post.id}/comments/stream/'
+        headers = {'Authorization': f'Bearer {token["access"]}', 'Last-Event-ID': str(comment_1_post.id)}
+
+        async def main():
+            client = AsyncClient()
+            assert (await client.get(url)).status_code == 401
+
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200
+            assert response['Content-Type'] == 'text/event-stream'
+            events = response.streaming_content
+            event_id, data = parse_event(await asyncio.wait_for(events.__anext__(), 5))
+            assert event_id == comment_2_post.id, \
+                'Проверьте, что поток повторяет комментарии после `Last-Event-ID`'
+
+            created = await sync_to_async(user_client.post)(
+                f'/api/v1/posts/{post.id}/comments/', data={'text': 'Живой коммент'}
+            )
+            event_id, data = parse_event(await asyncio.wait_for(events.__anext__(), 5))
+            assert event_id == created.json()['id'] and data == created.json(), \
+                'Проверьте, что новые комментарии отправляются в поток'
+            await events.aclose()
+
+        asyncio.run(main())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comment_stream_out_of_order(self, token, post, user):
+        from api.broker import get_broker
+        from api.models import Comment
+
+        url = f'/api/v1/posts/{post.id}/comments/stream/'
+
+        async def main():
+            response = await AsyncClient().get(url, headers={'Authorization': f'Bearer {token["access"]}'})
+            events = response.streaming_content
+            # Let the stream finish its replay and wait for live events.
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.sleep(0.2)
+            first, second = [
+                await sync_to_async(Comment.objects.create)(text=f'Коммент {i}', author=user, post=post)
+                for i in range(2)
+            ]
+            # The later comment is committed and published first.
+            for comment in (second, first):
+                get_broker().publish(f'comments:{post.id}', {'id': comment.id, 'text': comment.text})
+            received = [parse_event(await asyncio.wait_for(pending, 5))[0],
+                        parse_event(await asyncio.wait_for(events.__anext__(), 5))[0]]
+            assert received == [second.id, first.id], \
+                'Проверьте, что события, опубликованные не по порядку id, не теряются'
+            await events.aclose()
+
+        asyncio.run(main())
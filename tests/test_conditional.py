@@ -0,0 +1,65 @@
+import pytest
+
+from api.models import Post
+
+
+class TestConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_not_modified(self, client, user, post):
+        response = client.get('/api/v1/posts/')
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], \
+            'Проверьте, что GET `/api/v1/posts/` возвращает заголовки `ETag` и `Last-Modified`'
+
+        response = client.get('/api/v1/posts/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, \
+            'Проверьте, что при совпадении `If-None-Match` возвращается статус 304'
+        assert response['ETag'] == etag
+
+        Post.objects.create(text='Новый пост', author=user)
+        response = client.get('/api/v1/posts/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, \
+            'Проверьте, что после добавления записи `ETag` меняется'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_edit_changes_etag(self, user_client, post):
+        etag = user_client.get(f'/api/v1/posts/{post.id}/')['ETag']
+        user_client.patch(f'/api/v1/posts/{post.id}/', data={'text': 'Новый текст'})
+
+        response = user_client.get(f'/api/v1/posts/{post.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, \
+            'Проверьте, что после изменения записи `ETag` меняется'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_local_memory_cache(self, settings, client, post):
+        from api.caching import check_cache_backend
+
+        settings.API_CACHE_ALIAS = 'default'
+        etag = client.get(f'/api/v1/posts/{post.id}/')['ETag']
+        assert etag, 'Проверьте, что кэш в памяти процесса тоже поддерживается'
+        assert client.get(f'/api/v1/posts/{post.id}/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert [error.id for error in check_cache_backend(None)] == ['api.W001'], \
+            'Проверьте, что кэш в памяти процесса сопровождается предупреждением проверки системы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_if_modified_since(self, user_client, user, post, comment_1_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        last_modified = user_client.get(url)['Last-Modified']
+
+        response = user_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, \
+            'Проверьте, что при `If-Modified-Since` без изменений возвращается статус 304'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_missing_post_not_found(self, client):
+        response = client.get('/api/v1/posts/100500/', HTTP_IF_NONE_MATCH='"etag"')
+
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_malformed_pk_not_found(self, client):
+        response = client.get('/api/v1/posts/abc/')
+
+        assert response.status_code == 404, \
+            'Проверьте, что запрос записи с нечисловым id возвращает статус 404'
@@ -0,0 +1,41 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Post
+
+
+class TestCommentsCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_count_updates(self, user_client, post, comment_2_post):
+        Post.objects.filter(pk=post.pk).update(comments_count=1)
+        response = user_client.post(f'/api/v1/posts/{post.id}/comments/', data={'text': 'Коммент'})
+        assert response.status_code == 201
+
+        test_data = user_client.get(f'/api/v1/posts/{post.id}/').json()
+        assert test_data.get('comments_count') == 2, \
+            'Проверьте, что `comments_count` увеличивается при создании комментария'
+
+        comment_id = response.json()['id']
+        response = user_client.delete(f'/api/v1/posts/{post.id}/comments/{comment_id}/')
+        assert response.status_code == 204
+        post.refresh_from_db()
+        assert post.comments_count == 1, \
+            'Проверьте, что `comments_count` уменьшается при удалении комментария'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_count_read_only(self, user_client, post):
+        user_client.patch(f'/api/v1/posts/{post.id}/', data={'comments_count': 100})
+        post.refresh_from_db()
+
+        assert post.comments_count == 0, 'Проверьте, что поле `comments_count` доступно только для чтения'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reconcile_comments_count(self, post, another_post, comment_1_post, comment_2_post):
+        Post.objects.filter(pk=another_post.pk).update(comments_count=5)
+        call_command('reconcile_comments_count', '--batch-size=1', stdout=StringIO())
+
+        assert dict(Post.objects.values_list('pk', 'comments_count')) == {post.pk: 2, another_post.pk: 0}, \
+            'Проверьте, что команда `reconcile_comments_count` пересчитывает счётчики'
@@ -0,0 +1,42 @@
+import pytest
+from django.db import connections
+
+from api.database import get_sqlite_pragmas
+
+
+def open_connection(tmp_path, name):
+    default = connections['default']
+    return type(default)({**default.settings_dict, 'NAME': str(tmp_path / f'{name}.sqlite3')}, alias=name)
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+class TestSqliteProfile:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_tuned_connection(self, settings, tmp_path):
+        settings.SQLITE_PROFILE = 'tuned'
+        wrapper = open_connection(tmp_path, 'tuned')
+        try:
+            assert pragma(wrapper, 'journal_mode') == 'wal', \
+                'Проверьте, что новые соединения SQLite переключаются в режим WAL'
+            assert pragma(wrapper, 'synchronous') == 1
+            assert pragma(wrapper, 'busy_timeout') == 5000
+            assert pragma(wrapper, 'mmap_size') == 256 * 1024 * 1024
+        finally:
+            wrapper.close()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_default_profile(self, settings, tmp_path):
+        settings.SQLITE_PROFILE = 'default'
+        wrapper = open_connection(tmp_path, 'plain')
+        try:
+            assert get_sqlite_pragmas() == {}
+            assert pragma(wrapper, 'journal_mode') == 'delete', \
+                'Проверьте, что профиль `default` не меняет настройки SQLite'
+        finally:
+            wrapper.close()
@@ -0,0 +1,51 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class TestExport:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_admin_only(self, user_client):
+        response = user_client.get('/api/v1/export/')
+
+        assert response.status_code == 403, \
+            'Проверьте, что `/api/v1/export/` доступен только администраторам'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_stream(self, user_client, user, post, another_post, comment_1_post, comment_2_post):
+        user.is_staff = True
+        user.save()
+        response = user_client.get('/api/v1/export/')
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        assert [line['id'] for line in lines] == [post.id, another_post.id], \
+            'Проверьте, что экспорт содержит все записи в порядке публикации'
+        assert lines[0]['author'] == user.username
+        assert [comment['id'] for comment in lines[0]['comments']] == [comment_1_post.id, comment_2_post.id], \
+            'Проверьте, что записи экспортируются вместе с комментариями'
+        assert lines[1]['comments'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_since(self, user_client, user, post, another_post):
+        user.is_staff = True
+        user.save()
+        response = user_client.get('/api/v1/export/', {'since': post.pub_date.isoformat()})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+
+        assert [json.loads(line)['id'] for line in lines] == [another_post.id], \
+            'Проверьте, что параметр `since` ограничивает экспорт новыми записями'
+        assert user_client.get('/api/v1/export/?since=yesterday').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_command(self, post, another_post, comment_1_another_post):
+        stdout = StringIO()
+        call_command('export_posts', '--chunk-size=1', stdout=stdout)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+        assert [line['id'] for line in lines] == [post.id, another_post.id]
+        assert lines[1]['comments'][0]['text'] == comment_1_another_post.text
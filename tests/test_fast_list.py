@@ -0,0 +1,37 @@
+import pytest
+
+from api.caching import get_cache
+from api.models import Post
+
+
+def compare(settings, client, url):
+    settings.API_FAST_LIST = True
+    get_cache().clear()
+    fast = client.get(url)
+    settings.API_FAST_LIST = False
+    get_cache().clear()
+    slow = client.get(url)
+    assert fast.status_code == slow.status_code == 200
+    return fast.content, slow.content
+
+
+class TestFastList:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_fast_list_identical(self, settings, user_client, post, another_post, comment_1_post, comment_2_post,
+                                 follow_1, group_1):
+        Post.objects.filter(pk=post.pk).update(image='posts/picture.png',
+                                               image_variants={'small_webp': 'posts/variants/picture_small.webp'})
+        urls = (
+            '/api/v1/posts/',
+            '/api/v1/posts/?limit=1',
+            f'/api/v1/posts/?group={group_1.id}',
+            '/api/v1/posts/?search=пост',
+            f'/api/v1/posts/{post.id}/comments/',
+            '/api/v1/feed/?limit=5',
+            '/api/v1/group/',
+        )
+        for url in urls:
+            fast, slow = compare(settings, user_client, url)
+            assert fast == slow, \
+                f'Проверьте, что быстрый список `{url}` совпадает с выводом сериализатора'
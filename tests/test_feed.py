@@ -0,0 +1,99 @@
+from base64 import urlsafe_b64encode
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Follow, Post, TimelineEntry
+
+
+class TestFeedAPI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_not_auth(self, client):
+        response = client.get('/api/v1/feed/')
+
+        assert response.status_code == 401, \
+            'Проверьте, что `/api/v1/feed/` при запросе без токена возвращает статус 401'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_fan_out_on_write(self, user_client, user, another_user, user_2):
+        Follow.objects.create(user=user, following=another_user)
+        client = user_client.__class__()
+        client.force_authenticate(another_user)
+        response = client.post('/api/v1/posts/', data={'text': 'Пост для ленты'})
+        assert response.status_code == 201
+
+        assert TimelineEntry.objects.filter(user=user, post_id=response.json()['id']).exists(), \
+            'Проверьте, что новая запись попадает в ленту подписчиков'
+        assert not TimelineEntry.objects.filter(user=user_2).exists()
+
+        Post.objects.create(text='Чужой пост', author=user_2)
+        test_data = user_client.get('/api/v1/feed/').json()
+        assert [item['text'] for item in test_data] == ['Пост для ленты'], \
+            'Проверьте, что `/api/v1/feed/` возвращает записи только отслеживаемых авторов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_fan_out_on_read(self, settings, user_client, user, another_user):
+        settings.FEED_FANOUT_FOLLOWER_LIMIT = 0
+        user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        client = user_client.__class__()
+        client.force_authenticate(another_user)
+        client.post('/api/v1/posts/', data={'text': 'Пост популярного автора'})
+
+        assert not TimelineEntry.objects.exists()
+        test_data = user_client.get('/api/v1/feed/?limit=10').json()
+        assert [item['text'] for item in test_data['results']] == ['Пост популярного автора'], \
+            'Проверьте, что записи популярных авторов добавляются в ленту при чтении'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_merged_pages(self, settings, user_client, user, user_2, another_user):
+        settings.FEED_FANOUT_FOLLOWER_LIMIT = 1
+        user_client.post('/api/v1/follow/', data={'following': user_2.username})
+        Post.objects.create(text='Старый пост', author=another_user)
+        user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        client = user_client.__class__()
+        client.force_authenticate(user_2)
+        client.post('/api/v1/follow/', data={'following': another_user.username})
+        for i in range(3):
+            for author in (another_user, user_2):
+                client.force_authenticate(author)
+                client.post('/api/v1/posts/', data={'text': f'Пост {author.username} {i}'})
+
+        expected = list(Post.objects.order_by('-pub_date', '-pk').values_list('pk', flat=True))
+        assert [item['id'] for item in user_client.get('/api/v1/feed/').json()] == expected, \
+            'Проверьте, что лента объединяет записи из таблицы ленты и записи популярных авторов без повторов'
+        ids = []
+        page = user_client.get('/api/v1/feed/?limit=2').json()
+        while True:
+            ids += [item['id'] for item in page['results']]
+            if page['next'] is None:
+                break
+            page = user_client.get(page['next']).json()
+        assert ids == expected, 'Проверьте постраничный вывод объединённой ленты'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_invalid_cursor(self, user_client, follow_1):
+        for raw in (f'2021-01-01T00:00:00+00:00|{2 ** 63}', '2021-01-01T00:00:00+00:00|0',
+                    '2021-01-01T00:00:00|1'):
+            cursor = urlsafe_b64encode(raw.encode()).decode()
+            response = user_client.get(f'/api/v1/feed/?cursor={cursor}')
+            assert response.status_code == 404, \
+                'Проверьте, что курсор ленты вне допустимого диапазона возвращает статус 404'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_feed_follow_backfill(self, user_client, user, another_post):
+        response = user_client.post('/api/v1/follow/', data={'following': another_post.author.username})
+        assert response.status_code == 201
+
+        test_data = user_client.get('/api/v1/feed/').json()
+        assert [item['id'] for item in test_data] == [another_post.id], \
+            'Проверьте, что при подписке в ленту добавляются записи автора'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuild_timelines(self, user, follow_1, another_post, post):
+        TimelineEntry.objects.create(user=user, post=post, pub_date=post.pub_date)
+        call_command('rebuild_timelines', stdout=StringIO())
+
+        assert list(TimelineEntry.objects.filter(user=user).values_list('post', flat=True)) == [another_post.id], \
+            'Проверьте, что команда `rebuild_timelines` пересобирает ленты'
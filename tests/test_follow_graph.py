@@ -0,0 +1,84 @@
+from base64 import urlsafe_b64encode
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.models import Follow, FollowCounts
+from tests.test_queries import count_queries
+
+
+def counts(user):
+    row = FollowCounts.objects.filter(user=user).first()
+    return (row.followers_count, row.following_count) if row else (0, 0)
+
+
+class TestFollowGraph:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counts_updated(self, user_client, user, another_user):
+        response = user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        assert response.status_code == 201
+
+        assert counts(user) == (0, 1), 'Проверьте, что подписка увеличивает счётчик подписок'
+        assert counts(another_user) == (1, 0), 'Проверьте, что подписка увеличивает счётчик подписчиков'
+
+        response = user_client.post('/api/v1/follow/', data={'following': another_user.username})
+        assert response.status_code == 400
+        assert counts(another_user) == (1, 0), 'Проверьте, что повторная подписка не меняет счётчики'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_profile(self, user_client, user, user_2, another_user):
+        for follower in (user_2, another_user):
+            Follow.objects.create(user=follower, following=user)
+        call_command('reconcile_follow_counts', stdout=StringIO())
+
+        response = user_client.get(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 200
+        assert response.json() == {'username': user.username, 'followers_count': 2, 'following_count': 0}
+        assert user_client.get(f'/api/v1/users/{another_user.username}/').json()['following_count'] == 1
+        assert user_client.get('/api/v1/users/nobody/').status_code == 404
+        assert count_queries(user_client, f'/api/v1/users/{user.username}/') == 1, \
+            'Проверьте, что профиль читает счётчики одним запросом'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_followers_and_following(self, user_client, user, user_2, another_user, follow_2, follow_3, follow_4):
+        response = user_client.get(f'/api/v1/users/{user.username}/followers/')
+        assert response.status_code == 200
+        assert response.json() == [{'username': user_2.username}, {'username': another_user.username}]
+
+        response = user_client.get(f'/api/v1/users/{user_2.username}/following/')
+        assert response.json() == [{'username': user.username}, {'username': another_user.username}]
+        assert user_client.get('/api/v1/users/nobody/followers/').status_code == 404
+
+        page = user_client.get(f'/api/v1/users/{user.username}/followers/?limit=1').json()
+        assert page['results'] == [{'username': user_2.username}]
+        page = user_client.get(page['next']).json()
+        assert page['results'] == [{'username': another_user.username}]
+        assert page['next'] is None, 'Проверьте постраничный вывод подписчиков'
+        for raw in (str(2 ** 63), '-1', 'abc'):
+            cursor = urlsafe_b64encode(raw.encode()).decode()
+            response = user_client.get(f'/api/v1/users/{user.username}/following/?cursor={cursor}')
+            assert response.status_code == 404, 'Проверьте, что недопустимый курсор возвращает статус 404'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_check(self, user_client, user, user_2, another_user, follow_1):
+        url = f'/api/v1/follow/check/?username={another_user.username},{user_2.username}&username=nobody'
+        response = user_client.get(url)
+
+        assert response.status_code == 200
+        assert response.json() == {another_user.username: True, user_2.username: False, 'nobody': False}
+        assert count_queries(user_client, url) == 1, \
+            'Проверьте, что подписки проверяются одним запросом'
+
+        usernames = ','.join(f'user{i}' for i in range(101))
+        assert user_client.get(f'/api/v1/follow/check/?username={usernames}').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reconcile_follow_counts(self, user, user_2, another_user, follow_1, follow_2):
+        FollowCounts.objects.create(user=user_2, followers_count=7, following_count=0)
+        call_command('reconcile_follow_counts', '--batch-size=1', stdout=StringIO())
+
+        assert counts(user) == (1, 1)
+        assert counts(user_2) == (0, 1)
+        assert counts(another_user) == (1, 0)
@@ -0,0 +1,110 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Post
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), len(queries)
+
+
+class TestGroupPosts:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_posts(self, user_client, post, post_2, another_post, group_1):
+        url = f'/api/v1/group/{group_1.id}/posts/'
+        test_data, _ = get(user_client, url)
+
+        assert [item['id'] for item in test_data] == [post_2.id, post.id], \
+            'Проверьте, что `/api/v1/group/{id}/posts/` возвращает записи группы, новые первыми'
+        assert test_data[0] == user_client.get(f'/api/v1/posts/{post_2.id}/').json()
+        assert user_client.get('/api/v1/group/100500/posts/').status_code == 404
+        assert user_client.get('/api/v1/group/99999999999999999999/posts/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_empty_group(self, user_client, group_2):
+        url = f'/api/v1/group/{group_2.id}/posts/'
+        test_data, _ = get(user_client, url)
+        assert test_data == []
+
+        test_data, queries = get(user_client, url)
+        assert test_data == []
+        assert queries == 0, 'Проверьте, что существование пустой группы проверяется один раз'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_first_page_cached(self, user_client, user, group_1, settings):
+        settings.GROUP_POSTS_CACHE_DEPTH = 3
+        posts = [Post.objects.create(text=f'Пост {i}', author=user, group=group_1) for i in range(5)]
+        url = f'/api/v1/group/{group_1.id}/posts/?limit=2'
+        get(user_client, url)
+        page, queries = get(user_client, url)
+
+        assert [item['id'] for item in page['results']] == [posts[4].id, posts[3].id]
+        assert queries == 0, 'Проверьте, что первая страница группы читается из кэша без запросов к базе'
+
+        page, _ = get(user_client, page['next'])
+        assert [item['id'] for item in page['results']] == [posts[2].id, posts[1].id]
+        page, _ = get(user_client, page['next'])
+        assert [item['id'] for item in page['results']] == [posts[0].id]
+        assert page['next'] is None
+
+        _, queries = get(user_client, f'/api/v1/group/{group_1.id}/posts/?limit=4')
+        assert queries > 0, 'Проверьте, что страницы больше кэша читаются из базы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cache_updated_on_create(self, user_client, post, group_1):
+        url = f'/api/v1/group/{group_1.id}/posts/?limit=5'
+        get(user_client, url)
+        response = user_client.post('/api/v1/posts/', data={'text': 'Новый пост', 'group': group_1.id})
+        assert response.status_code == 201
+        assert 'group' not in response.json()
+        page, queries = get(user_client, url)
+
+        assert [item['id'] for item in page['results']] == [response.json()['id'], post.id], \
+            'Проверьте, что новые записи добавляются в кэш группы'
+        assert queries == 0
+        assert page['results'][0] == response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cache_dropped_on_change(self, user_client, post, post_2, group_1):
+        url = f'/api/v1/group/{group_1.id}/posts/'
+        get(user_client, url)
+        user_client.patch(f'/api/v1/posts/{post.id}/', data={'text': 'Изменённый пост'})
+        test_data, _ = get(user_client, url)
+        assert test_data[1]['text'] == 'Изменённый пост', \
+            'Проверьте, что изменение записи сбрасывает кэш группы'
+
+        comment = user_client.post(f'/api/v1/posts/{post.id}/comments/', data={'text': 'Коммент'}).json()
+        test_data, queries = get(user_client, url)
+        assert test_data[1]['comments_count'] == 1
+        assert queries == 0, 'Проверьте, что комментарий обновляет счётчик в кэше группы, не сбрасывая его'
+
+        user_client.delete(f'/api/v1/posts/{post.id}/comments/{comment["id"]}/')
+        test_data, queries = get(user_client, url)
+        assert test_data[1]['comments_count'] == 0
+        assert queries == 0
+
+        user_client.delete(f'/api/v1/posts/{post_2.id}/')
+        test_data, _ = get(user_client, url)
+        assert [item['id'] for item in test_data] == [post.id], \
+            'Проверьте, что удаление записи сбрасывает кэш группы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_load_overlapping_write(self, monkeypatch, post, post_2, group_1):
+        from api import group_posts
+
+        depth = group_posts.get_depth()
+        monkeypatch.setattr(group_posts, 'get_depth', lambda: group_posts.discard_groups(group_1.id) or depth)
+        rows, _ = group_posts.get_recent_posts(group_1.id)
+        assert [row['id'] for row in rows] == [post_2.id, post.id]
+        assert group_posts.recent_posts.get(group_1.id) is None, \
+            'Проверьте, что загрузка, пересёкшаяся с записью, не сохраняется в кэш группы'
+
+        newer = ([], True)
+        monkeypatch.setattr(group_posts, 'get_depth', lambda: group_posts.recent_posts.set(group_1.id, newer) or depth)
+        assert group_posts.get_recent_posts(group_1.id) is newer, \
+            'Проверьте, что загруженные строки не перезаписывают более новую запись кэша'
@@ -0,0 +1,52 @@
+import pytest
+
+from api.models import Comment, Post
+from tests.test_queries import count_queries
+
+
+class TestHydrate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_hydrate_order(self, user_client, post, post_2, another_post):
+        url = f'/api/v1/posts/hydrate/?ids={another_post.id},{post.id}&ids=100500,{post_2.id},{post.id}'
+        response = user_client.get(url)
+
+        assert response.status_code == 200
+        test_data = response.json()
+        assert [item['id'] for item in test_data] == [another_post.id, post.id, post_2.id], \
+            'Проверьте, что записи возвращаются в запрошенном порядке без неизвестных id'
+        assert test_data[1] == user_client.get(f'/api/v1/posts/{post.id}/').json(), \
+            'Проверьте, что записи сериализуются так же, как в `/api/v1/posts/{id}/`'
+        assert count_queries(user_client, url) == 1, \
+            'Проверьте, что записи загружаются одним запросом вместе с авторами'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_hydrate_comments(self, user_client, user, post, another_post):
+        comments = [Comment.objects.create(text=f'Коммент {i}', author=user, post=post) for i in range(4)]
+        url = f'/api/v1/posts/hydrate/?ids={post.id},{another_post.id}&comments=2'
+        response = user_client.get(url)
+
+        assert response.status_code == 200
+        test_data = response.json()
+        assert [item['id'] for item in test_data[0]['comments']] == [comments[3].id, comments[2].id], \
+            'Проверьте, что встраиваются последние комментарии каждой записи'
+        assert test_data[0]['comments'][0] == user_client.get(
+            f'/api/v1/posts/{post.id}/comments/{comments[3].id}/').json()
+        assert test_data[1]['comments'] == []
+        assert count_queries(user_client, url) == 2, \
+            'Проверьте, что комментарии всех записей загружаются одним запросом'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_hydrate_validation(self, user_client, user, settings):
+        settings.POSTS_HYDRATE_MAX_ITEMS = 2
+        response = user_client.get('/api/v1/posts/hydrate/?ids=1,abc')
+        assert response.status_code == 400
+        assert user_client.get('/api/v1/posts/hydrate/?ids=1,2,3').status_code == 400
+        for ids in ('99999999999999999999999', '0', '-1'):
+            response = user_client.get(f'/api/v1/posts/hydrate/?ids={ids}')
+            assert response.status_code == 400, \
+                'Проверьте, что id вне диапазона 64-битных целых возвращают ошибку 400'
+            assert response.json() == user_client.get('/api/v1/posts/hydrate/?ids=1,abc').json()
+        assert user_client.get('/api/v1/posts/hydrate/?ids=1&comments=x').status_code == 400
+        assert user_client.get('/api/v1/posts/hydrate/').json() == []
+        assert Post.objects.count() == 0
@@ -0,0 +1,67 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from api.models import Post
+
+
+def make_image(size=(1000, 500)):
+    buffer = BytesIO()
+    Image.new('RGBA', size, (255, 0, 0, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile('picture.png', buffer.getvalue(), content_type='image/png')
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_VARIANTS = {'small': 100, 'large': 400}
+    settings.IMAGE_VARIANTS_ASYNC = False
+    return tmp_path
+
+
+class TestPostImages:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_upload(self, user_client, media):
+        response = user_client.post('/api/v1/posts/', data={'text': 'Пост с картинкой', 'image': make_image()},
+                                    format='multipart')
+        assert response.status_code == 201, \
+            'Проверьте, что при POST запросе с изображением на `/api/v1/posts/` возвращается статус 201'
+        post = Post.objects.get(pk=response.json()['id'])
+        assert post.image, 'Проверьте, что изображение сохраняется'
+
+        test_data = user_client.get(f'/api/v1/posts/{post.id}/').json()
+        assert set(test_data['image_variants']) == {'small_webp', 'small_jpeg', 'large_webp', 'large_jpeg'}, \
+            'Проверьте, что `image_variants` содержит ссылки на все варианты изображения'
+        assert test_data['image'].startswith('http://testserver/media/posts/')
+
+        with Image.open(media / post.image_variants['small_webp']) as variant:
+            assert variant.format == 'WEBP' and max(variant.size) == 100
+        with Image.open(media / post.image_variants['large_jpeg']) as variant:
+            assert variant.format == 'JPEG' and variant.size == (400, 200)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_image_replace(self, user_client, media, post):
+        user_client.patch(f'/api/v1/posts/{post.id}/', data={'image': make_image((50, 50))}, format='multipart')
+        post.refresh_from_db()
+        first_variants = post.image_variants
+        assert first_variants
+
+        user_client.patch(f'/api/v1/posts/{post.id}/', data={'image': make_image((60, 60))}, format='multipart')
+        post.refresh_from_db()
+        assert post.image_variants and post.image_variants != first_variants, \
+            'Проверьте, что при замене изображения варианты пересоздаются'
+        assert not any((media / path).exists() for path in first_variants.values()), \
+            'Проверьте, что файлы заменённого изображения удаляются'
+
+        user_client.delete(f'/api/v1/posts/{post.id}/')
+        assert not [path for path in media.rglob('*') if path.is_file()], \
+            'Проверьте, что при удалении записи удаляются её изображение и варианты'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_post_without_image(self, user_client, post):
+        test_data = user_client.get(f'/api/v1/posts/{post.id}/').json()
+
+        assert test_data['image'] is None and test_data['image_variants'] == {}
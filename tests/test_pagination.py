@@ -0,0 +1,52 @@
+import pytest
+
+from api.models import Post
+
+
+class TestPostPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_not_paginated_by_default(self, user_client, post, another_post):
+        response = user_client.get('/api/v1/posts/')
+
+        assert type(response.json()) == list, \
+            'Проверьте, что без параметров `cursor` и `limit` `/api/v1/posts/` возвращает список'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_cursor_walk(self, user_client, user):
+        posts = [Post.objects.create(text=f'Пост {i}', author=user) for i in range(5)]
+        expected = sorted((p.id for p in posts), reverse=True)
+
+        response = user_client.get('/api/v1/posts/?limit=2')
+        assert response.status_code == 200
+        test_data = response.json()
+        assert set(test_data) >= {'next', 'results'}, \
+            'Проверьте, что при запросе с `limit` возвращается страница с полями `next` и `results`'
+
+        received = [item['id'] for item in test_data['results']]
+        Post.objects.create(text='Новый пост', author=user)
+        while test_data['next']:
+            test_data = user_client.get(test_data['next']).json()
+            received += [item['id'] for item in test_data['results']]
+
+        assert received == expected, \
+            'Проверьте, что курсорная пагинация возвращает все записи по порядку без повторов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_cursor_group_filter(self, user_client, post, post_2, another_post, group_1):
+        response = user_client.get(f'/api/v1/posts/?group={group_1.id}&limit=1')
+        test_data = response.json()
+        assert len(test_data['results']) == 1
+        assert test_data['next'] is not None
+
+        test_data = user_client.get(test_data['next']).json()
+        assert len(test_data['results']) == 1
+        assert test_data['next'] is None, \
+            'Проверьте, что курсорная пагинация учитывает фильтр `group`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_invalid_cursor(self, user_client, post):
+        response = user_client.get('/api/v1/posts/?cursor=broken')
+
+        assert response.status_code == 404, \
+            'Проверьте, что при неверном `cursor` возвращается статус 404'
@@ -0,0 +1,84 @@
+import re
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.profiling import RollingHistogram, get_registry
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.API_PROFILING = True
+    settings.API_PROFILING_SAMPLE_RATE = 1
+    settings.API_PROFILING_SLOW_SECONDS = 0
+    settings.API_PROFILING_DUMP_DIR = str(tmp_path)
+    get_registry().clear()
+    yield tmp_path
+    get_registry().clear()
+
+
+def metric(text, name, route):
+    match = re.search(rf'^yatube_api_{name}{{route="{route}",method="GET"}} (\S+)$', text, re.M)
+    assert match, f'Проверьте, что метрика `{name}` записана для `{route}`'
+    return float(match.group(1))
+
+
+class TestProfiling:
+
+    def test_rolling_histogram(self):
+        histogram = RollingHistogram((0.1, 1), window=60, slots=3)
+        histogram.observe(0.05, now=0)
+        histogram.observe(0.5, now=25)
+        histogram.observe(5, now=45)
+
+        assert histogram.snapshot(now=50) == ([1, 2, 3], 5.55, 3)
+        assert histogram.snapshot(now=65) == ([0, 1, 2], 5.5, 2), \
+            'Проверьте, что старые наблюдения выпадают из окна гистограммы'
+        assert histogram.snapshot(now=200) == ([0, 0, 0], 0.0, 0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_metrics(self, profiling, user, token, post, comment_1_post):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token["access"]}')
+
+        assert client.get('/api/v1/posts/').status_code == 200
+        assert client.get(f'/api/v1/posts/{post.id}/comments/').status_code == 200
+        assert client.get('/api/v1/metrics/').status_code == 403, \
+            'Проверьте, что метрики доступны только администраторам'
+
+        user.is_staff = True
+        user.save()
+        response = client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert '# TYPE yatube_api_request_duration_seconds histogram' in text
+        assert metric(text, 'request_duration_seconds_count', 'posts-list') == 1
+        assert metric(text, 'sql_queries_sum', 'posts-list') >= 1, \
+            'Проверьте, что записывается число SQL-запросов'
+        assert metric(text, 'sql_duration_seconds_sum', 'comments-list') > 0
+        assert metric(text, 'serializer_duration_seconds_sum', 'posts-list') > 0, \
+            'Проверьте, что записывается время сериализации'
+        assert list(profiling.glob('posts-list-*.prof')), \
+            'Проверьте, что медленные запросы сохраняются в профиль cProfile'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_metrics(self, profiling, post):
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from django.test import AsyncClient
+
+        from api.middleware import ProfilingMiddleware
+
+        async def get_response(request):
+            pass
+
+        assert iscoroutinefunction(ProfilingMiddleware(get_response)), \
+            'Проверьте, что middleware профилирования поддерживает асинхронный режим'
+        response = async_to_sync(AsyncClient().get)('/api/v1/async/posts/')
+        assert response.status_code == 200
+
+        text = get_registry().render()
+        assert metric(text, 'request_duration_seconds_count', 'async-posts-list') == 1, \
+            'Проверьте, что запросы к асинхронным эндпоинтам профилируются'
+        assert metric(text, 'sql_queries_sum', 'async-posts-list') >= 1, \
+            'Проверьте, что считаются SQL-запросы асинхронного ORM'
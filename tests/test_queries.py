@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.caching import get_cache
+from api.models import Comment, Follow, Post
+
+
+def count_queries(client, url):
+    # Warm up authentication cache, response cache is dropped before each run.
+    get_cache().clear()
+    client.get(url)
+    get_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+class TestListQueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_list_queries(self, user_client, user, another_user, post):
+        single = count_queries(user_client, '/api/v1/posts/')
+        for i in range(10):
+            Post.objects.create(text=f'Пост {i}', author=another_user)
+
+        assert count_queries(user_client, '/api/v1/posts/') == single == 2, \
+            'Проверьте, что GET `/api/v1/posts/` выполняет постоянное число SQL запросов'
+        assert count_queries(user_client, '/api/v1/posts/?limit=5') == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_list_queries(self, user_client, user, another_user, post, comment_1_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        single = count_queries(user_client, url)
+        for i in range(10):
+            Comment.objects.create(text=f'Коммент {i}', author=another_user, post=post)
+
+        assert count_queries(user_client, url) == single == 3, \
+            'Проверьте, что GET `/api/v1/posts/{post.id}/comments/` выполняет постоянное число SQL запросов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_list_queries(self, user_client, user, django_user_model, follow_2):
+        single = count_queries(user_client, '/api/v1/follow/')
+        for i in range(10):
+            follower = django_user_model.objects.create(username=f'follower_{i}')
+            Follow.objects.create(user=follower, following=user)
+
+        assert count_queries(user_client, '/api/v1/follow/') == single == 1, \
+            'Проверьте, что GET `/api/v1/follow/` выполняет постоянное число SQL запросов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_group_list_queries(self, user_client, group_1, group_2):
+        assert count_queries(user_client, '/api/v1/group/') == 2, \
+            'Проверьте, что GET `/api/v1/group/` выполняет постоянное число SQL запросов'
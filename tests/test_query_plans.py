@@ -0,0 +1,68 @@
+import re
+from urllib.parse import quote
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.caching import get_cache
+from api.pagination import encode_position
+
+# Tables listed in full by design, they have no filter to index.
+FULL_LIST_TABLES = {'api_group'}
+
+FULL_SCAN_RE = re.compile(r'^SCAN (\w+)$')
+
+TEMP_SORT_RE = re.compile(r'^USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY$')
+
+
+def plan_problems(client, url, allow_sort=False):
+    get_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    problems = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            for row in cursor.fetchall():
+                match = FULL_SCAN_RE.match(row[-1])
+                if match and match.group(1) not in FULL_LIST_TABLES:
+                    problems.append((query['sql'], row[-1]))
+                if TEMP_SORT_RE.match(row[-1]) and not allow_sort:
+                    problems.append((query['sql'], row[-1]))
+    return problems
+
+
+class TestQueryPlans:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_no_full_scans(self, user_client, post, another_post, comment_1_post, follow_1, follow_2, group_1):
+        urls = (
+            '/api/v1/posts/',
+            '/api/v1/posts/?limit=1',
+            f'/api/v1/posts/?group={group_1.id}',
+            f'/api/v1/posts/?group={group_1.id}&limit=1',
+            f'/api/v1/posts/{post.id}/',
+            f'/api/v1/posts/{post.id}/comments/',
+            '/api/v1/follow/',
+            '/api/v1/follow/?search=TestUser2',
+            '/api/v1/group/',
+            '/api/v1/feed/',
+            '/api/v1/feed/?limit=1',
+            f'/api/v1/feed/?cursor={quote(encode_position(post.pub_date, post.id))}',
+        )
+        for url in urls:
+            assert plan_problems(user_client, url) == [], \
+                f'Проверьте, что запросы `{url}` используют индексы'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_merged_results_no_full_scans(self, user_client, post, comment_1_post, follow_1):
+        # Ranked and merged results are sorted after lookup by design.
+        urls = (
+            '/api/v1/posts/?search=пост',
+            f'/api/v1/posts/{post.id}/comments/?search=коммент',
+        )
+        for url in urls:
+            assert plan_problems(user_client, url, allow_sort=True) == [], \
+                f'Проверьте, что запросы `{url}` используют индексы'
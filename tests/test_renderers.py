@@ -0,0 +1,89 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    'id': 1,
+    'text': 'Тестовый пост \u2028\u2029 с "кавычками" и \\ слэшем\n',
+    'float': 0.1,
+    'none': None,
+    'flags': [True, False],
+    'decimal': Decimal('1.50'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'date': datetime.date(2021, 1, 2),
+    3: 'int key',
+}
+
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def fast_json(request, monkeypatch):
+    if request.param:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+    return request.param
+
+
+class TestFastJSON:
+
+    def test_render_compatible(self, fast_json):
+        expected = JSONRenderer().render(DATA)
+
+        assert FastJSONRenderer().render(DATA) == expected, \
+            'Проверьте, что рендерер выдаёт тот же JSON, что и `JSONRenderer`'
+        assert FastJSONRenderer().render(None) == b''
+        assert FastJSONRenderer().render({'big': 2 ** 70}) == b'{"big":1180591620717411303424}'
+        assert FastJSONRenderer().render(DATA, 'application/json; indent=4') == \
+            JSONRenderer().render(DATA, 'application/json; indent=4')
+
+    def test_render_datetime(self, fast_json):
+        value = datetime.datetime(2021, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        content = FastJSONRenderer().render({'pub_date': value})
+
+        assert content == b'{"pub_date":"2021-01-02T03:04:05Z"}', \
+            'Проверьте, что даты в UTC выводятся с суффиксом `Z`'
+
+    def test_parse_compatible(self, fast_json):
+        body = JSONRenderer().render({'text': 'пост', 'group': 1, 'list': [1.5, None]})
+
+        assert FastJSONParser().parse(BytesIO(body)) == JSONParser().parse(BytesIO(body))
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"text": '))
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"value": NaN}'))
+
+    def test_parse_other_charset(self, fast_json):
+        body = '{"text": "пост"}'.encode('utf-16')
+
+        assert FastJSONParser().parse(BytesIO(body), parser_context={'encoding': 'utf-16'}) == {'text': 'пост'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_responses_compatible(self, fast_json, settings, user_client, post, another_post, comment_1_post,
+                                  group_1):
+        urls = (
+            '/api/v1/posts/',
+            f'/api/v1/posts/{post.id}/',
+            f'/api/v1/posts/{post.id}/comments/',
+            '/api/v1/group/',
+        )
+        for url in urls:
+            response = user_client.get(url)
+            assert response.status_code == 200
+            assert response.content == JSONRenderer().render(response.json()), \
+                f'Проверьте, что ответ `{url}` совпадает с выводом `JSONRenderer`'
+
+        settings.API_FAST_LIST = False
+        response = user_client.post('/api/v1/posts/', data={'text': 'Новый пост'}, format='json')
+        assert response.status_code == 201
+        assert response.content == JSONRenderer().render(response.json())
@@ -0,0 +1,91 @@
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from api.caching import get_cache
+from api.models import Post
+
+
+@pytest.fixture
+def replica(settings, tmp_path, user, another_user):
+    # Empty SQLite file standing in for a lagging replica of the default database.
+    default = connections['default']
+    connections['replica'] = type(default)({**default.settings_dict, 'NAME': str(tmp_path / 'replica.sqlite3')},
+                                           alias='replica')
+    call_command('migrate', database='replica', verbosity=0)
+    for instance in (user, another_user):
+        instance.save(using='replica', force_insert=True)
+    settings.DATABASE_REPLICAS = ['replica']
+    yield 'replica'
+    connections['replica'].close()
+    del connections['replica']
+
+
+@pytest.fixture
+def another_client(another_user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(another_user).access_token}')
+    return client
+
+
+class TestReplicaRouting:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reads_go_to_replica(self, user_client, post, replica):
+        response = user_client.get('/api/v1/posts/')
+
+        assert response.status_code == 200
+        assert response.json() == [], \
+            'Проверьте, что безопасные запросы читают данные из реплики'
+        response = user_client.get(f'/api/v1/posts/{post.id}/')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_writes_go_to_primary(self, user_client, replica):
+        response = user_client.post('/api/v1/posts/', data={'text': 'Новый пост'})
+
+        assert response.status_code == 201
+        assert Post.objects.using('default').filter(pk=response.json()['id']).exists(), \
+            'Проверьте, что запись выполняется в основную базу'
+        assert not Post.objects.using('replica').exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_read_your_writes(self, user_client, another_client, replica):
+        response = user_client.post('/api/v1/posts/', data={'text': 'Новый пост'})
+        assert response.status_code == 201
+
+        response = user_client.get('/api/v1/posts/')
+        assert [item['text'] for item in response.json()] == ['Новый пост'], \
+            'Проверьте, что после записи клиент читает основную базу'
+        assert another_client.get('/api/v1/posts/').json() == [], \
+            'Проверьте, что другие клиенты продолжают читать реплику'
+
+        get_cache().clear()
+        assert user_client.get('/api/v1/posts/').json() == [], \
+            'Проверьте, что привязка к основной базе истекает'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_admin_reads_primary(self, client, user, post, replica):
+        user.is_staff = user.is_superuser = True
+        user.save()
+        client.force_login(user)
+        response = client.get('/admin/api/post/')
+
+        assert response.status_code == 200
+        assert post.text in response.content.decode(), \
+            'Проверьте, что страницы админки читают основную базу'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_session_write_sticks_user(self, client, user, user_client, replica):
+        user.is_staff = user.is_superuser = True
+        user.save()
+        client.force_login(user)
+        response = client.post('/admin/api/group/add/',
+                               data={'title': 'Группа', 'slug': 'group', 'description': 'Описание'})
+        assert response.status_code == 302
+
+        assert [item['title'] for item in user_client.get('/api/v1/group/').json()] == ['Группа'], \
+            'Проверьте, что запись с редиректом привязывает пользователя к основной базе'
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+
+from api.models import Comment, Post
+from api.search import get_search_backend
+
+
+class TestFullTextSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_search(self, client, user, group_1):
+        Post.objects.create(text='Котики и собаки', author=user)
+        best = Post.objects.create(text='Котики, котики, котики', author=user, group=group_1)
+        Post.objects.create(text='Про погоду', author=user)
+
+        test_data = client.get('/api/v1/posts/?search=котики').json()
+        assert [item['text'] for item in test_data][0] == best.text, \
+            'Проверьте, что результаты поиска `/api/v1/posts/?search=` упорядочены по релевантности'
+        assert len(test_data) == 2, \
+            'Проверьте, что `/api/v1/posts/?search=` возвращает только подходящие записи'
+
+        test_data = client.get(f'/api/v1/posts/?search=котики&group={group_1.id}').json()
+        assert [item['id'] for item in test_data] == [best.id], \
+            'Проверьте, что поиск совместим с фильтром `group`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_posts_search_paginated(self, client, user):
+        for i in range(3):
+            Post.objects.create(text=f'Поиск {i}', author=user)
+
+        test_data = client.get('/api/v1/posts/?search=поиск&limit=2').json()
+        assert test_data['count'] == 3 and len(test_data['results']) == 2, \
+            'Проверьте, что результаты поиска разбиваются на страницы параметром `limit`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_index_in_sync(self, client, user, post):
+        post.text = 'Обновлённый текст'
+        post.save()
+        assert client.get('/api/v1/posts/?search=тестовый').json() == []
+        assert len(client.get('/api/v1/posts/?search=обновлённый').json()) == 1, \
+            'Проверьте, что поисковый индекс обновляется при изменении записи'
+
+        Post.objects.bulk_create([Post(text='Пакетная запись', author=user)])
+        assert len(client.get('/api/v1/posts/?search=пакетная').json()) == 1
+
+        post.delete()
+        assert client.get('/api/v1/posts/?search=обновлённый').json() == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_query_syntax(self, client, post):
+        response = client.get('/api/v1/posts/?search=" OR * NEAR(')
+
+        assert response.status_code == 200, \
+            'Проверьте, что спецсимволы в запросе не приводят к ошибке'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_comments_search(self, user_client, post, comment_1_post, comment_2_post):
+        Comment.objects.create(text='Совсем другой', author=post.author, post=post)
+        test_data = user_client.get(f'/api/v1/posts/{post.id}/comments/?search=коммент').json()
+
+        assert {item['id'] for item in test_data} == {comment_1_post.id, comment_2_post.id}, \
+            'Проверьте, что `/api/v1/posts/{post.id}/comments/?search=` находит комментарии'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_search_uses_index(self):
+        queryset = Post.objects.all()
+        sql = str(get_search_backend().search(queryset, 'text', 'слово').query)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}'.replace('слово', "'слово'"))
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+        assert 'VIRTUAL TABLE INDEX' in plan and 'USING INTEGER PRIMARY KEY' in plan, \
+            'Проверьте, что поиск использует полнотекстовый индекс'
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F
+from django.utils import timezone
+
+from api.models import Comment, Follow, Group, Post, User
+
+SIZES = {'users': 6, 'groups': 3, 'posts': 40, 'comments': 90, 'follows': 2,
+         'chunk_size': 7, 'batch_size': 5}
+
+
+def seed(**options):
+    call_command('seed_yatube', **{**SIZES, **options}, stdout=StringIO())
+
+
+def snapshot():
+    return {
+        'posts': list(Post.objects.order_by('pk').values_list(
+            'pk', 'text', 'pub_date', 'author_id', 'group_id')),
+        'comments': list(Comment.objects.order_by('pk').values_list(
+            'pk', 'text', 'created', 'author_id', 'post_id')),
+        'follows': sorted(Follow.objects.values_list(
+            'user_id', 'following_id')),
+    }
+
+
+def clear():
+    Post.objects.all().delete()
+    Follow.objects.all().delete()
+    Group.objects.all().delete()
+    User.objects.all().delete()
+
+
+class TestSeeding:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_seed_counts(self):
+        seed(timelines=True)
+
+        assert User.objects.count() == 6
+        assert Group.objects.count() == 3
+        assert Post.objects.count() == 40
+        assert Comment.objects.count() == 90
+        assert Follow.objects.exists()
+        assert not Follow.objects.filter(user=F('following')).exists(), \
+            'Проверьте, что пользователи не подписываются на себя'
+        mismatched = Post.objects.annotate(
+            actual=Count('comments')
+        ).exclude(comments_count=F('actual'))
+        assert not mismatched.exists(), \
+            'Проверьте, что `comments_count` соответствует числу комментариев'
+        assert Post.objects.filter(pub_date__year=2020).count() == 40, \
+            'Проверьте, что сгенерированные даты публикации сохраняются'
+        with pytest.raises(CommandError):
+            seed()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_seed_deterministic(self):
+        seed(seed=3)
+        first = snapshot()
+        clear()
+        seed(seed=3, keep_indexes=True)
+
+        assert snapshot() == first, \
+            'Проверьте, что данные определяются только параметрами и seed'
+        clear()
+        seed(seed=4)
+        assert snapshot() != first
+
+    @pytest.mark.django_db(transaction=True)
+    def test_auto_dates_untouched(self, user):
+        seed()
+        post = Post.objects.create(text='Новый пост', author=user)
+
+        assert post.pub_date > timezone.now() - timedelta(minutes=1), \
+            'Проверьте, что заполнение не отключает `auto_now_add` у моделей'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_indexes_restored(self, client):
+        with connection.cursor() as cursor:
+            before = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table)
+        seed()
+        with connection.cursor() as cursor:
+            after = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table)
+
+        assert after == before, \
+            'Проверьте, что индексы пересоздаются после заполнения'
+        word = Post.objects.first().text.split()[-1]
+        response = client.get('/api/v1/posts/', {'search': word})
+        assert response.status_code == 200
+        assert len(response.json()) > 0, \
+            'Проверьте, что поисковый индекс перестраивается после заполнения'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_all_secondary_indexes_deferred(self):
+        from api.seeding import INDEXED_MODELS, deferred_indexes, get_secondary_indexes
+
+        names = {index.name for index in get_secondary_indexes(Comment)}
+        assert any(name.startswith('api_comment_post_id') for name in names)
+        with deferred_indexes(INDEXED_MODELS):
+            assert not any(get_secondary_indexes(model) for model in INDEXED_MODELS), \
+                'Проверьте, что на время заполнения удаляются все неуникальные индексы, включая индексы внешних ключей'
+        assert {index.name for index in get_secondary_indexes(Comment)} == names
@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import CacheBucketStore, parse_rate, refill
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+            'posts': '2/min',
+            'token': '1/min',
+            'token_refresh': '1/min',
+        },
+    }
+
+
+class TestThrottling:
+
+    def test_token_bucket(self):
+        capacity, rate = parse_rate('2/s')
+        assert (capacity, rate) == (2, 2)
+
+        bucket, wait = refill(None, capacity, rate, 10.0)
+        assert (bucket, wait) == ((1, 10.0), 0)
+        bucket, wait = refill(bucket, capacity, rate, 10.0)
+        assert wait == 0
+        bucket, wait = refill(bucket, capacity, rate, 10.0)
+        assert wait == 0.5, 'Проверьте, что пустое ведро сообщает время до следующего токена'
+        bucket, wait = refill(bucket, capacity, rate, 10.5)
+        assert wait == 0, 'Проверьте, что токены восполняются со временем'
+
+    def test_cache_store(self):
+        store = CacheBucketStore()
+
+        assert store.take('api:throttle:test', 1, 1 / 60) == 0
+        assert store.take('api:throttle:test', 1, 1 / 60) > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_scope_throttled(self, rates, user_client, another_user):
+        assert user_client.get('/api/v1/posts/').status_code == 200
+        assert user_client.get('/api/v1/posts/').status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get('/api/v1/posts/')
+
+        assert response.status_code == 429, \
+            'Проверьте, что превышение лимита запросов возвращает 429'
+        assert int(response['Retry-After']) > 0
+        assert len(queries) == 0, \
+            'Проверьте, что запрос отклоняется без обращения к базе данных'
+        assert user_client.get('/api/v1/group/').status_code == 200, \
+            'Проверьте, что лимиты считаются отдельно для каждого эндпоинта'
+
+        from rest_framework.test import APIClient
+        client = APIClient()
+        client.force_authenticate(another_user)
+        assert client.get('/api/v1/posts/').status_code == 200, \
+            'Проверьте, что лимиты считаются отдельно для каждого пользователя'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_token_throttled(self, rates, client, user):
+        data = {'username': user.username, 'password': '1234567'}
+
+        assert client.post('/api/v1/token/', data=data).status_code == 200
+        assert client.post('/api/v1/token/', data=data).status_code == 429, \
+            'Проверьте, что получение токена ограничено по адресу клиента'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_async_views_throttled(self, rates, user_client, client, post):
+        assert user_client.get('/api/v1/posts/').status_code == 200
+        assert user_client.get('/api/v1/async/posts/').status_code == 200
+        response = user_client.get('/api/v1/async/posts/')
+
+        assert response.status_code == 429, \
+            'Проверьте, что асинхронные эндпоинты используют те же лимиты, что и синхронные'
+        assert int(response['Retry-After']) > 0
+        assert user_client.get(f'/api/v1/async/posts/{post.id}/').status_code == 429
+        assert user_client.get('/api/v1/async/group/').status_code == 200
+        assert client.get('/api/v1/async/posts/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_refresh_scope(self, rates, client, user):
+        data = {'username': user.username, 'password': '1234567'}
+        refresh = client.post('/api/v1/token/', data=data).json()['refresh']
+
+        assert client.post('/api/v1/token/refresh/', data={'refresh': refresh}).status_code == 200, \
+            'Проверьте, что обновление токена не расходует попытки входа'
+        assert client.post('/api/v1/token/refresh/', data={'refresh': refresh}).status_code == 429
@@ -22,11 +22,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -51,13 +53,83 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube_api.wsgi.application'
 
+# Set to 'asgi' by asgi.py. Persistent connections are only reused by WSGI
+# worker threads, every async request may run in a new thread, so under
+# ASGI connections are closed after each request unless DB_CONN_MAX_AGE
+# says otherwise.
+SERVER_INTERFACE = os.environ.get('SERVER_INTERFACE', 'wsgi')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get(
+            'DB_CONN_MAX_AGE', 0 if SERVER_INTERFACE == 'asgi' else 60
+        )),
+        'CONN_HEALTH_CHECKS': True,
+        # Writers take the lock when the transaction starts, so they wait
+        # for busy_timeout instead of failing on a lock upgrade.
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+# Read replicas of the default database, comma separated SQLite files.
+DATABASE_REPLICAS = []
+
+for number, name in enumerate(
+        filter(None, os.environ.get('DATABASE_REPLICA_NAMES', '').split(','))):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.database.ReplicaRouter']
+
+# Clients read the primary for this many seconds after their writes.
+REPLICA_STICKY_SECONDS = 5
+
+# PRAGMAs applied to every new SQLite connection, picked by SQLITE_PROFILE.
+SQLITE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'cache_size': -20000,
+    },
+}
+
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'tuned')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube',
+    },
+    'files': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.cache'),
+    },
+}
+
+# Cache alias used for serialized API responses and their versions. It must
+# be shared between worker processes, otherwise writes invalidate responses
+# of the writing process only. 'files' also keeps them between restarts,
+# 'default' keeps them in memory and only suits a single process.
+API_CACHE_ALIAS = os.environ.get('API_CACHE_ALIAS', 'files')
+
+API_CACHE_TIMEOUT = 300
+
+# List actions render '.values()' rows directly instead of serializers.
+API_FAST_LIST = True
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -87,18 +159,124 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Uploads are streamed to a temporary file in chunks instead of memory.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Resized post image variants, maximal side in pixels.
+IMAGE_VARIANTS = {
+    'small': 320,
+    'medium': 800,
+    'large': 1600,
+}
+
+# Variants are rendered in a thread pool off the request thread.
+IMAGE_VARIANTS_ASYNC = True
+
+IMAGE_VARIANTS_WORKERS = 2
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ScopedBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'posts': '600/min',
+        'comments': '600/min',
+        'feed': '300/min',
+        'follow': '300/min',
+        'group': '300/min',
+        'export': '10/min',
+        'token': '20/min',
+        'token_refresh': '60/min',
+    },
 }
 
+# Opt-in request profiling, histograms are served at /api/v1/metrics/ and
+# cover the last API_PROFILING_WINDOW seconds.
+API_PROFILING = os.environ.get('API_PROFILING', '') == '1'
+
+API_PROFILING_WINDOW = 300
+
+# Share of requests run under cProfile, dumped to API_PROFILING_DUMP_DIR
+# if they take longer than API_PROFILING_SLOW_SECONDS.
+API_PROFILING_SAMPLE_RATE = 0.0
+
+API_PROFILING_SLOW_SECONDS = 1.0
+
+API_PROFILING_DUMP_DIR = os.path.join(BASE_DIR, '.profiles')
+
+# Token bucket store of the throttles, 'api.throttling.CacheBucketStore'
+# shares buckets between processes through API_CACHE_ALIAS.
+API_THROTTLE_STORE = 'api.throttling.MemoryBucketStore'
+
+API_THROTTLE_STORE_SIZE = 100000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
-}
\ No newline at end of file
+}
+
+# In-process cache of authenticated users, entries live for TTL seconds.
+AUTH_USER_CACHE_SIZE = 10000
+
+AUTH_USER_CACHE_TTL = 60
+
+# In-process cache of the newest posts of up to GROUP_POSTS_CACHE_SIZE
+# groups, served by /api/v1/group/{id}/posts/. Writes of other processes
+# show up within TTL seconds.
+GROUP_POSTS_CACHE_SIZE = 1000
+
+GROUP_POSTS_CACHE_DEPTH = 50
+
+GROUP_POSTS_CACHE_TTL = 60
+
+# Authors with more followers than this, as stored in 'FollowCounts', are
+# merged into feeds on read instead of being written into every follower's
+# timeline.
+FEED_FANOUT_FOLLOWER_LIMIT = 10000
+
+FEED_BACKFILL_SIZE = 100
+
+FEED_BATCH_SIZE = 1000
+
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Maximal number of usernames of one /api/v1/follow/check/ request.
+FOLLOW_CHECK_MAX_ITEMS = 100
+
+# Maximal numbers of posts and embedded comments per post of one
+# /api/v1/posts/hydrate/ request.
+POSTS_HYDRATE_MAX_ITEMS = 100
+
+POSTS_HYDRATE_MAX_COMMENTS = 20
+
+BULK_CREATE_BATCH_SIZE = 500
+
+# Broker of live comment events, replace for multi-process deployments.
+COMMENT_EVENTS_BROKER = 'api.broker.InProcessBroker'
+
+COMMENT_EVENTS_QUEUE_SIZE = 100
+
+COMMENT_EVENTS_HEARTBEAT = 15